@@ -0,0 +1,117 @@
+import time
+import logging
+from collections import deque
+from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from src.utils.tracer import tracer
+
+logger = logging.getLogger(__name__)
+
+class CommandQueue(QObject):
+    """Single path from operator input (hotkeys, buttons, remote control) to the player and playlist.
+
+    Navigation is debounced on the trailing edge: each press moves the pending target and restarts
+    a short settle window, and only the final target is cut to once presses stop (or after
+    max_hold_ms of continuous auto-repeat), so a burst of presses loads one file. With
+    leading_edge=True the first press of a burst cuts at once instead and the final target follows
+    when the window closes. Ordinary commands run in order on the next event-loop turn. Critical
+    commands (black, freeze, fade, stop) run synchronously and never wait behind anything.
+    """
+    stats_changed = pyqtSignal(object)
+
+    def __init__(self, playlist_manager, settle_ms=80, max_hold_ms=600, leading_edge=False):
+        super().__init__()
+        self.playlist_manager = playlist_manager
+        self.leading_edge = leading_edge
+        self.max_hold = max_hold_ms / 1000.0
+        self.stats = {'submitted': 0, 'executed': 0, 'collapsed': 0, 'critical': 0, 'depth': 0, 'max_depth': 0}
+
+        self._pending = deque()
+        self._nav_target = None
+        self._nav_since = None
+
+        self._settle = QTimer(self)
+        self._settle.setSingleShot(True)
+        self._settle.setInterval(settle_ms)
+        self._settle.timeout.connect(self._on_settled)
+        self._drain_timer = QTimer(self)
+        self._drain_timer.setSingleShot(True)
+        self._drain_timer.setInterval(0)
+        self._drain_timer.timeout.connect(self._drain)
+
+    @property
+    def depth(self):
+        return len(self._pending) + (self._nav_target is not None)
+
+    # --- Input side ---
+
+    def critical(self, name, fn, *args):
+        tracer.instant(f"command {name}", 'input', critical=True)
+        self.stats['critical'] += 1
+        fn(*args)
+        self._report()
+
+    def submit(self, name, fn, *args):
+        tracer.instant(f"command {name}", 'input')
+        self.stats['submitted'] += 1
+        self._pending.append((name, fn, args))
+        self._drain_timer.start()
+        self._report()
+
+    def navigate(self, delta=0, index=None):
+        """Moves to index, or delta items from the latest target (pending or current)."""
+        count = len(self.playlist_manager.items())
+        if not count: return
+        current = self.playlist_manager.current_index
+        if index is None:
+            base = self._nav_target if self._nav_target is not None else current
+            index = base + delta
+        index = max(0, min(count - 1, index))
+        # Next on the last item (or Prev on the first) leaves the item on air alone
+        if index == current and self._nav_target is None: return
+        self.stats['submitted'] += 1
+        tracer.instant("command navigate", 'input', target=index)
+
+        if self.leading_edge and not self._settle.isActive():
+            self._cut(index)
+            self._nav_since = time.monotonic()
+            self._settle.start()
+        else:
+            if self._nav_target is not None: self.stats['collapsed'] += 1
+            elif not self._settle.isActive(): self._nav_since = time.monotonic()
+            self._nav_target = index
+            # Auto-repeat keeps the window open, but a held key still cuts every max_hold
+            if time.monotonic() - self._nav_since < self.max_hold or not self._settle.isActive():
+                self._settle.start()
+        self._report()
+
+    # --- Execution side ---
+
+    def _on_settled(self):
+        target, self._nav_target = self._nav_target, None
+        if target is not None and target != self.playlist_manager.current_index:
+            self._cut(target)
+            if self.leading_edge:
+                self._nav_since = time.monotonic()
+                self._settle.start()
+        self._report()
+
+    def _cut(self, index):
+        self.stats['executed'] += 1
+        with tracer.span("CommandQueue.navigate", 'input', index=index):
+            self.playlist_manager.set_current_index(index)
+
+    def _drain(self):
+        while self._pending:
+            name, fn, args = self._pending.popleft()
+            self.stats['executed'] += 1
+            with tracer.span(f"CommandQueue.{name}", 'input'):
+                try: fn(*args)
+                except Exception: logger.exception(f"Command {name} failed")
+        self._report()
+
+    def _report(self):
+        depth = self.depth
+        self.stats['depth'] = depth
+        self.stats['max_depth'] = max(self.stats['max_depth'], depth)
+        tracer.counter("command queue", 'input', depth=depth, collapsed=self.stats['collapsed'])
+        self.stats_changed.emit(dict(self.stats))
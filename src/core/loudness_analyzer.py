@@ -0,0 +1,186 @@
+import os
+import re
+import sys
+import json
+import shutil
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal, QStandardPaths
+from src.core.show_bundle import ShowBundle, is_bundle_uri, parse_uri
+
+try:
+    import imageio_ffmpeg
+except ImportError:
+    imageio_ffmpeg = None
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTS = ('.mp4', '.mov', '.mkv', '.avi', '.webm', '.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg')
+
+_INTEGRATED_RE = re.compile(r"I:\s+(-?[\d.]+|-inf)\s+LUFS")
+_PEAK_RE = re.compile(r"Peak:\s+(-?[\d.]+|-inf)\s+dBFS")
+_NO_WINDOW = 0x08000000 if sys.platform == 'win32' else 0
+
+def find_ffmpeg():
+    """ffmpeg next to the app, then on PATH, then from the imageio-ffmpeg package; None if there is none."""
+    app_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else \
+        os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    for name in ('ffmpeg.exe', 'ffmpeg'):
+        local = os.path.join(app_dir, name)
+        if os.path.isfile(local): return local
+    found = shutil.which('ffmpeg')
+    if found or imageio_ffmpeg is None: return found
+    try: return imageio_ffmpeg.get_ffmpeg_exe()
+    except RuntimeError: return None
+
+def _to_float(text):
+    return float('-inf') if text == '-inf' else float(text)
+
+class LoudnessAnalyzer(QObject):
+    """Measures integrated loudness and true peak of playlist items in the background and caches a gain per file.
+
+    Each measurement is a separate ffmpeg process (ebur128 filter), so the pool below only has to
+    bound how many run at once; the decoding itself never touches the GUI process. ffmpeg is looked
+    for next to the app, then on PATH, then in the imageio-ffmpeg package; without it analysis is
+    disabled (see `available`) and files play at their own level.
+    """
+    analysis_ready = pyqtSignal(str, float)
+
+    def __init__(self, playlist_manager, target_lufs=-23.0, max_true_peak=-1.0, max_gain=12.0, workers=None, ffmpeg=None):
+        super().__init__()
+        self.playlist_manager = playlist_manager
+        self.target_lufs = target_lufs
+        self.max_true_peak = max_true_peak
+        self.max_gain = max_gain
+        self.ffmpeg = ffmpeg or find_ffmpeg()
+        self.cache_path = os.path.join(
+            QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation), 'loudness.json')
+
+        self._lock = threading.Lock()
+        self._cache = self._load_cache()
+        self._pending = set()
+        self._gains = {}  # playlist filepath -> gain; filled by the workers so lookups never touch storage
+        self._processes = set()
+        self._stopping = False
+        self._pool = ThreadPoolExecutor(max_workers=workers or max(1, (os.cpu_count() or 2) // 2),
+                                        thread_name_prefix="Loudness")
+
+        if not self.ffmpeg: logger.warning("ffmpeg not found: loudness analysis disabled")
+        self.playlist_manager.rowsInserted.connect(self._on_rows_inserted)
+
+    # --- Public API ---
+
+    @property
+    def available(self):
+        return bool(self.ffmpeg)
+
+    def gain_for(self, filepath):
+        """Gain in dB for filepath, or None if it has not been measured (or has no audio).
+
+        Only reads what the workers have stored, so it is safe on the cut path: the file itself may
+        sit on slow storage.
+        """
+        return self._gains.get(filepath)
+
+    def analyze(self, filepath):
+        """Looks up (or measures) filepath on a worker; the file is only touched off the GUI thread."""
+        if not self.ffmpeg or self._stopping: return
+        if os.path.splitext(filepath)[1].lower() not in AUDIO_EXTS: return
+        with self._lock:
+            if filepath in self._pending: return
+            self._pending.add(filepath)
+        self._pool.submit(self._run, filepath)
+
+    def shutdown(self):
+        self._stopping = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            for proc in list(self._processes): proc.kill()
+            self._save_cache()
+
+    # --- Internals ---
+
+    def _on_rows_inserted(self, parent, first, last):
+        for item in self.playlist_manager.items()[first:last + 1]: self.analyze(item.filepath)
+
+    def _gain(self, result):
+        gain = self.target_lufs - result['lufs']
+        if result['peak'] is not None: gain = min(gain, self.max_true_peak - result['peak'])
+        return max(-self.max_gain * 2, min(self.max_gain, gain))
+
+    def _identity(self, filepath):
+        try:
+            if is_bundle_uri(filepath):
+                bundle_path, name = parse_uri(filepath)
+                st = os.stat(bundle_path)
+                return f"{bundle_path}#{name}|{st.st_size}|{st.st_mtime_ns}"
+            st = os.stat(filepath)
+            return f"{os.path.abspath(filepath)}|{st.st_size}|{st.st_mtime_ns}"
+        except (OSError, ValueError):
+            return None
+
+    def _ffmpeg_input(self, filepath):
+        if not is_bundle_uri(filepath): return filepath
+        bundle_path, name = parse_uri(filepath)
+        start, size = ShowBundle.open(bundle_path).entry_range(name)
+        return f"subfile,,start,{start},end,{start + size},,:{bundle_path}"
+
+    def _run(self, filepath):
+        key = self._identity(filepath)
+        with self._lock:
+            result = self._cache.get(key) if key else None
+        measured = False
+        if key and result is None:
+            try:
+                result = self._measure(filepath)
+                measured = True
+            except Exception as e:
+                logger.warning(f"Loudness analysis failed for {filepath}: {e}")
+        with self._lock:
+            self._pending.discard(filepath)
+            if result is None or self._stopping: return
+            if measured:
+                self._cache[key] = result
+                self._save_cache()
+            gain = self._gain(result) if 'lufs' in result else None
+            self._gains[filepath] = gain
+        if gain is not None:
+            if measured:
+                logger.info(f"Loudness {os.path.basename(filepath)}: {result['lufs']:.1f} LUFS, "
+                            f"peak {result['peak']} dBTP -> gain {gain:+.1f} dB")
+            self.analysis_ready.emit(filepath, gain)
+
+    def _measure(self, filepath):
+        cmd = [self.ffmpeg, '-nostdin', '-hide_banner', '-nostats', '-i', self._ffmpeg_input(filepath),
+               '-map', '0:a:0?', '-vn', '-sn', '-dn', '-af', 'ebur128=peak=true', '-f', 'null', '-']
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                                errors='replace', creationflags=_NO_WINDOW)
+        with self._lock: self._processes.add(proc)
+        try: _, stderr = proc.communicate()
+        finally:
+            with self._lock: self._processes.discard(proc)
+        if self._stopping: return None
+
+        integrated = _INTEGRATED_RE.findall(stderr)
+        if proc.returncode != 0 or not integrated:
+            # No audio stream (ffmpeg has nothing to map) is a valid, cacheable answer
+            return {'no_audio': True} if 'does not contain any stream' in stderr or proc.returncode == 0 else None
+        lufs = _to_float(integrated[-1])
+        if lufs == float('-inf'): return {'no_audio': True}
+        peaks = _PEAK_RE.findall(stderr)
+        peak = _to_float(peaks[-1]) if peaks else None
+        return {'lufs': lufs, 'peak': peak if peak != float('-inf') else None}
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, encoding='utf-8') as f: return json.load(f)
+        except (OSError, ValueError): return {}
+
+    def _save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f: json.dump(self._cache, f)
+        except OSError as e:
+            logger.warning(f"Could not save loudness cache: {e}")
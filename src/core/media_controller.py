@@ -1,8 +1,14 @@
 import logging
 import os
 import sys
+import time
 import ctypes
 from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from src.core.show_bundle import BUNDLE_PROTOCOL, open_uri_stream, acquire_uri_range
+from src.core.switch_metrics import SwitchMetrics, LatencyHistogram
+from src.core.player_state import PlayerStateStore, OBSERVED_PROPERTIES
+from src.core.sim_player import SimulatedMPV
+from src.utils.tracer import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -56,152 +62,459 @@ except (ImportError, OSError, FileNotFoundError):
     MPV_AVAILABLE = False
     mpv = None
 
-class MockMPV:
-    """Simulates MPV behavior when libmpv is missing."""
-    def __init__(self, **kwargs):
-        self.pause = False
-        self.time_pos = 0.0
-        self.duration = 100.0
-        self.wid = None
-        self.speed = 1.0
-        self.volume = 100.0
-        self._observers = {}
-        
-        self._timer = QTimer()
-        self._timer.timeout.connect(self._update_time)
-        self._timer.start(100)
-
-    def _update_time(self):
-        if not self.pause:
-            self.time_pos += 0.1 * self.speed
-            if self.time_pos > self.duration: self.time_pos = 0.0
-            if 'time-pos' in self._observers:
-                self._observers['time-pos']('time-pos', self.time_pos)
-
-    def play(self, filepath):
-        self.time_pos = 0.0
-        self.pause = False
-        if 'duration' in self._observers:
-            self._observers['duration']('duration', self.duration)
-
-    def stop(self):
-        self.pause = True
-        self.time_pos = 0.0
-
-    def seek(self, position, reference='absolute'):
-        self.time_pos = position
-
-    def property_observer(self, name):
-        def decorator(func):
-            self._observers[name] = func
-            return func
-        return decorator
+# Startup values of the runtime options apply_options() may change: the player is created without
+# setting any of them, so these are mpv's built-in defaults (0.37+). restore_default_options() sends
+# them back without asking the player, which would mean a blocking call into libmpv.
+PLAYER_OPTION_DEFAULTS = {
+    'scale': 'lanczos', 'cscale': 'lanczos', 'dscale': 'hermite', 'correct-downscaling': 'yes',
+    'deband': 'no', 'framedrop': 'vo', 'vd-lavc-skiploopfilter': 'default', 'vd-lavc-fast': 'no',
+}
+
+BLACK_OVERLAY_ID = 1  # osd-overlay id
+FREEZE_OVERLAY_ID = 0  # overlay-add slot
+# Full-window black ASS drawing; the oversized rectangle covers any window aspect ratio
+_BLACK_ASS = (r"{\an7\pos(0,0)\bord0\shad0\1c&H000000&\1a&H%02X&\p1}"
+              r"m -10000 -10000 l 30000 -10000 30000 30000 -10000 30000{\p0}")
+
+def register_bundle_protocol(player):
+    """Serves pvshow:// URIs to the player straight from the bundle mapping.
+
+    python-mpv's register_stream_protocol copies every read into libmpv's buffer byte by byte in
+    Python (a few MB/s, holding the GIL), so for libmpv the stream callbacks are registered here
+    with mpv_stream_cb_add_ro and each read is a single memmove out of the mmap.
+    """
+    if not (MPV_AVAILABLE and isinstance(player, mpv.MPV)):
+        player.register_stream_protocol(BUNDLE_PROTOCOL, open_uri_stream)
+        return
+    streams = {}  # cookie -> callbacks, kept alive until libmpv closes the stream
+
+    @mpv.StreamOpenFn
+    def open_fn(_userdata, uri, info):
+        try: bundle, address, size = acquire_uri_range(uri.decode('utf-8'))
+        except ValueError: return mpv.ErrorCode.LOADING_FAILED
+        pos = [0]
+        cookie = id(pos)
+
+        def read(_cookie, buf, n):
+            n = min(n, size - pos[0])
+            if n <= 0: return 0
+            ctypes.memmove(buf, address + pos[0], n)
+            pos[0] += n
+            return n
+
+        def seek(_cookie, offset):
+            if offset < 0 or offset > size: return mpv.ErrorCode.GENERIC
+            pos[0] = offset
+            return offset
+
+        def close(_cookie):
+            streams.pop(cookie, None)
+            bundle.release_range()
+
+        callbacks = (mpv.StreamReadFn(read), mpv.StreamSeekFn(seek), mpv.StreamSizeFn(lambda _cookie: size),
+                     mpv.StreamCloseFn(close))
+        streams[cookie] = callbacks
+        info.contents.cookie = None
+        info.contents.read, info.contents.seek, info.contents.size, info.contents.close = callbacks
+        return 0
+
+    # The open callback must outlive the player handle
+    player._pvshow_stream_open = open_fn
+    mpv._mpv_stream_cb_add_ro(player.handle, BUNDLE_PROTOCOL.encode('utf-8'), ctypes.c_void_p(), open_fn)
 
 class MediaController(QObject):
     position_changed = pyqtSignal(float)
     duration_changed = pyqtSignal(float)
     playback_status_changed = pyqtSignal(bool)
+    switch_measured = pyqtSignal(object)
+    blackout_changed = pyqtSignal(bool)
+    freeze_changed = pyqtSignal(bool)
+    retargeted = pyqtSignal(float)
     
-    def __init__(self):
+    def __init__(self, player_factory=None):
         super().__init__()
         self.player = None
+        self.player_factory = player_factory
+        self.staging_cache = None
+        self.loudness_analyzer = None
+        self.switch_metrics = SwitchMetrics()
+        self.retarget_latency = LatencyHistogram()
+        self.state = PlayerStateStore()
+        self.engine_fallback = False
+        self.renderer = None  # SoftwareRenderer when output is rendered on the CPU
+        self._software_output = None
+        self._wid = None
+        self._retarget_started = None
+        self._recovering = False
+        self._options = {}
+        self._black_level = 0.0
+        self._blackout = False
+        self._fade = None
+        self._fade_timer = QTimer(self)
+        self._fade_timer.setInterval(16)
+        self._fade_timer.timeout.connect(self._fade_step)
+        self._frozen = False
+        self._freeze_generation = 0
+        self._freeze_buffer = None
         self._initialize_player()
 
     def _initialize_player(self):
-        if MPV_AVAILABLE:
+        self._wid = None
+        self.state.reset()
+        if self.player_factory:
+            # Injected players (simulation, software rendering) fail loudly instead of falling back
+            self.player = self.player_factory()
+            register_bundle_protocol(self.player)
+            self._setup_observers()
+            self._restore_player_state()
+        elif MPV_AVAILABLE:
+            player = None
             try:
-                self.player = mpv.MPV(input_default_bindings=True, input_vo_keyboard=True, osc=True, vo='gpu', hwdec='auto', keep_open='yes')
+                player = self.player = mpv.MPV(input_default_bindings=True, input_vo_keyboard=True, osc=True, vo='gpu', hwdec='auto', keep_open='yes')
+                register_bundle_protocol(self.player)
                 self._setup_observers()
+                self._restore_player_state()
             except Exception:
+                logger.exception("Could not initialise mpv")
+                if player is not None:
+                    try: player.terminate()
+                    except Exception: pass
                 self._use_mock()
         else:
             self._use_mock()
 
     def _use_mock(self):
-        self.player = MockMPV()
+        self.engine_fallback = True
+        self.player = SimulatedMPV()
+        register_bundle_protocol(self.player)
         self._setup_observers()
+        self._restore_player_state()
         
     @property
     def is_mock(self):
-        return isinstance(self.player, MockMPV)
+        return isinstance(self.player, SimulatedMPV)
 
     def _setup_observers(self):
-        @self.player.property_observer('time-pos')
-        def on_time_pos(name, value):
-            if value is not None: self.position_changed.emit(value)
-                
-        @self.player.property_observer('duration')
-        def on_duration(name, value):
-            if value is not None: self.duration_changed.emit(value)
+        # Simulated players run on virtual time, so cut latency is measured on their clock
+        self.switch_metrics.time_source = self.player.clock_time if self.is_mock else time.perf_counter
+        # observe_property, not the property_observer decorator: that sets an attribute on the handler,
+        # which fails for a bound method
+        for prop in OBSERVED_PROPERTIES: self.player.observe_property(prop, self._on_property)
+
+        # Runs on mpv's event thread; timestamps are taken there, the signal is queued to the GUI
+        @self.player.event_callback('file-loaded')
+        def on_file_loaded(event):
+            tracer.instant("mpv file-loaded", 'mpv')
+            self.switch_metrics.mark('file_loaded')
+
+        @self.player.event_callback('playback-restart')
+        def on_playback_restart(event):
+            tracer.instant("mpv playback-restart", 'mpv')
+            cut = self.switch_metrics.mark('first_frame')
+            if cut:
+                logger.info(f"Cut to {cut['filepath']}: loaded {cut.get('file_loaded_ms', 0):.0f} ms, "
+                            f"first frame {cut['first_frame_ms']:.0f} ms")
+                self.switch_measured.emit(cut)
 
+        @self.player.event_callback('video-reconfig')
+        def on_video_reconfig(event):
+            started, self._retarget_started = self._retarget_started, None
+            if started is None: return
+            ms = (self.switch_metrics.time_source() - started) * 1000.0
+            self.retarget_latency.add(ms)
+            tracer.instant("output retargeted", 'mpv', ms=ms)
+            logger.info(f"Output moved to wid {self._wid} in {ms:.0f} ms")
+            self.retargeted.emit(ms)
+
+    def _on_property(self, name, value):
+        # Called from mpv's event thread: store first, then queue the signal to the GUI
+        self.state.update(OBSERVED_PROPERTIES[name], value)
+        if tracer.enabled:
+            if name == 'time-pos': tracer.counter("time-pos", 'mpv', seconds=value or 0.0)
+            elif name != 'track-list': tracer.instant(f"mpv {name}", 'mpv', value=value)
+        if value is None: return
+        if name == 'time-pos': self.position_changed.emit(value)
+        elif name == 'duration': self.duration_changed.emit(value)
+        elif name == 'pause': self.playback_status_changed.emit(not value)
+
+    @tracer.traced('MediaController.set_window_id', 'mpv')
     def set_window_id(self, wid):
-        if self.player:
-            try:
-                if MPV_AVAILABLE and isinstance(self.player, mpv.MPV):
-                    self.player.wid = wid if wid is not None else 0
-                else:
-                    self.player.wid = wid
-            except:
-                self._initialize_player()
-
-    def load_file(self, filepath):
-        if not self.player: return False
+        if self.player and wid != self._wid:
+            self._wid = wid
+            # Queued like every other command; a failing player is handled by _send
+            self._send('set', 'wid', wid if wid is not None else 0)
+
+    @tracer.traced('MediaController.retarget', 'mpv')
+    def retarget(self, wid):
+        """Moves live output to another window while the clip keeps playing.
+
+        The new wid only takes effect when mpv re-creates its video output, so the video track is
+        deselected and reselected; audio and the playback position are untouched. The gap until the
+        next video-reconfig is recorded in retarget_latency. If mpv rejects this, the current file
+        is reloaded at its position instead.
+        """
+        if not self.player or wid == self._wid: return
+        self._wid = wid
+        if self.state.get('path') is None:
+            self._send('set', 'wid', wid if wid is not None else 0)
+            return
+        self._retarget_started = self.switch_metrics.time_source()
+        def done(error, result):
+            if error: self._reload_at_position()
+        self._send('set', 'wid', wid if wid is not None else 0)
+        self._send('set', 'vid', 'no')
+        self._send('set', 'vid', 'auto', on_done=done)
+
+    def _reload_at_position(self, state=None):
+        state = state or self.state.snapshot()
+        if not state.get('path'): return
+        logger.warning(f"Reloading {state['path']} at {state.get('time_pos') or 0.0:.2f}s")
+        options = f"start={state.get('time_pos') or 0.0:.3f},pause={'yes' if state.get('pause') else 'no'}"
+        self._send('loadfile', state['path'], 'replace', -1, options)
+
+    def _recover_player(self):
+        """Re-creates a failed player and resumes the current file where it was."""
+        state, wid = self.state.snapshot(), self._wid
+        self._recovering = True
         try:
-            self.player.play(filepath)
-            self.playback_status_changed.emit(True)
-            return True
-        except: return False
+            self._free_renderer()
+            try:
+                if hasattr(self.player, 'terminate'): self.player.terminate()
+            except Exception: pass
+            try: self._initialize_player()
+            except Exception: self._use_mock()
+            if wid is not None: self.set_window_id(wid)
+            if self._software_output: self.enable_software_output(*self._software_output)
+            self._reload_at_position(state)
+        finally:
+            self._recovering = False
+
+    # --- Software output: frames rendered into a CPU buffer, for machines without a GPU ---
+
+    def enable_software_output(self, width=1280, height=720):
+        """Renders the player's output through SoftwareRenderer; needs a player made by software_player().
 
-    def play(self):
-        self._exec_cmd(lambda: setattr(self.player, 'pause', False))
+        Kept across player recovery. Returns the renderer, or None if the player is simulated.
+        """
+        from src.core.sw_renderer import SoftwareRenderer  # sw_renderer imports this module
+        self._free_renderer()
+        self._software_output = (width, height)
+        if not self.is_mock: self.renderer = SoftwareRenderer(self.player, width, height)
+        return self.renderer
+
+    def disable_software_output(self):
+        self._software_output = None
+        self._free_renderer()
+
+    def _free_renderer(self):
+        # The render context must go before its player is terminated
+        if self.renderer:
+            self.renderer.free()
+            self.renderer = None
+
+    def set_staging_cache(self, staging_cache):
+        self.staging_cache = staging_cache
+
+    def set_loudness_analyzer(self, loudness_analyzer):
+        self.loudness_analyzer = loudness_analyzer
+
+    def load_file(self, filepath, on_done=None):
+        if not self.player: return False
+        source = filepath
+        if self.staging_cache: filepath = self.staging_cache.resolve(filepath)
+        self.switch_metrics.begin(filepath)
+        if not self._send('loadfile', filepath, 'replace', on_done=on_done): return False
+        if self.loudness_analyzer:
+            # Precomputed per-file gain goes into mpv's volume stage; no audio filter is inserted.
+            # Commands run in order, so this lands before the new file's audio starts.
+            gain = self.loudness_analyzer.gain_for(source)
+            self._send('set', 'volume-gain', f"{gain or 0.0:.2f}")
+        self._send('set', 'pause', 'no')
         self.playback_status_changed.emit(True)
+        return True
 
-    def pause(self):
-        self._exec_cmd(lambda: setattr(self.player, 'pause', True))
-        self.playback_status_changed.emit(False)
+    def play(self, on_done=None):
+        self._send('set', 'pause', 'no', on_done=on_done)
 
-    def toggle_pause(self):
-        if self.player:
-            self._exec_cmd(lambda: setattr(self.player, 'pause', not self.player.pause))
-            self.playback_status_changed.emit(not self.player.pause)
+    def pause(self, on_done=None):
+        self._send('set', 'pause', 'yes', on_done=on_done)
 
-    def stop(self):
-        self._exec_cmd(lambda: self.player.stop())
+    def toggle_pause(self, on_done=None):
+        self._send('cycle', 'pause', on_done=on_done)
+
+    def stop(self, on_done=None):
+        self._send('stop', on_done=on_done)
         self.playback_status_changed.emit(False)
 
-    def seek(self, position):
-        self._exec_cmd(lambda: self.player.seek(position, reference='absolute'))
+    def seek(self, position, on_done=None):
+        self._send('seek', position, 'absolute', on_done=on_done)
+
+    def set_volume(self, volume, on_done=None):
+        self._send('set', 'volume', volume, on_done=on_done)
+
+    def apply_options(self, options):
+        """Sets runtime mpv options (scalers, deband, framedrop...); they are re-applied if the player is recreated.
+
+        restore_default_options() returns them to the values in PLAYER_OPTION_DEFAULTS.
+        """
+        for name, value in options.items():
+            if self._options.get(name) == value: continue
+            self._options[name] = value
+            self._send('set', name, value)
+
+    def restore_default_options(self):
+        """Sends the startup value of every changed option; returns the names that have none on record."""
+        kept = {}
+        for name, value in self._options.items():
+            default = PLAYER_OPTION_DEFAULTS.get(name)
+            if default is None:
+                logger.warning(f"No startup value on record for mpv option {name}: left at {value}")
+                kept[name] = value
+            else:
+                self._send('set', name, default)
+        self._options = kept
+        return list(kept)
+
+    def _restore_player_state(self):
+        for name, value in self._options.items(): self._send('set', name, value)
+        if self._frozen:
+            # The new player has no overlay: the output is live again
+            self._freeze_generation += 1
+            self._frozen, self._freeze_buffer = False, None
+            self.freeze_changed.emit(False)
+        if self._black_level > 0: self._draw_black()
+
+    # --- Output state: drawn by the player on top of the video, the output binding is never touched ---
+
+    @property
+    def is_black(self):
+        target = self._fade[1] if self._fade else self._black_level
+        return target >= 1.0
+
+    @property
+    def is_frozen(self):
+        return self._frozen
+
+    def set_black(self, enabled):
+        self.fade(enabled, 0)
+
+    def fade(self, to_black, duration=1.0):
+        """Fades the output to (or back from) black over duration seconds; 0 switches on the next frame."""
+        target = 1.0 if to_black else 0.0
+        tracer.instant("output fade", 'output', target=target, duration=duration)
+        if duration <= 0:
+            self._fade = None
+            self._fade_timer.stop()
+            self._set_black_level(target)
+            return
+        self._fade = (self._black_level, target, time.perf_counter(), duration)
+        self._fade_timer.start()
+        self._fade_step()
+
+    def _fade_step(self):
+        if not self._fade:
+            self._fade_timer.stop()
+            return
+        start, target, started, duration = self._fade
+        t = min(1.0, (time.perf_counter() - started) / duration)
+        self._set_black_level(start + (target - start) * t)
+        if t >= 1.0:
+            self._fade = None
+            self._fade_timer.stop()
+
+    def _set_black_level(self, level):
+        if level == self._black_level and level in (0.0, 1.0): return
+        self._black_level = level
+        self._draw_black()
+        if level in (0.0, 1.0) and (level == 1.0) != self._blackout:
+            self._blackout = level == 1.0
+            self.blackout_changed.emit(self._blackout)
 
-    def set_volume(self, volume):
-        self._exec_cmd(lambda: setattr(self.player, 'volume', volume))
+    def _draw_black(self):
+        if self._black_level <= 0:
+            self._send('osd-overlay', BLACK_OVERLAY_ID, 'none', '')
+        else:
+            alpha = round(255 * (1.0 - self._black_level))
+            self._send('osd-overlay', BLACK_OVERLAY_ID, 'ass-events', _BLACK_ASS % alpha, 1920, 1080, 1000)
+
+    def freeze(self, enabled):
+        """Holds the current output frame on screen while the player keeps decoding underneath.
+
+        freeze_changed(True) is emitted once the frame is actually on screen; a failed grab emits
+        freeze_changed(False) and leaves the output live.
+        """
+        if enabled == self._frozen: return
+        self._frozen = enabled
+        self._freeze_generation += 1
+        generation = self._freeze_generation
+        tracer.instant("output freeze", 'output', enabled=enabled)
+        if enabled:
+            self._send('screenshot-raw', 'window', on_done=lambda e, r: self._on_freeze_frame(e, r, generation))
+        else:
+            self._send('overlay-remove', FREEZE_OVERLAY_ID, on_done=lambda e, r: self._release_freeze(generation))
+            self.freeze_changed.emit(False)
+
+    def _on_freeze_frame(self, error, frame, generation):
+        # mpv event thread; a newer freeze/unfreeze request makes this frame obsolete
+        if generation != self._freeze_generation: return
+        if error or not frame:
+            self._freeze_failed(generation, error or "no frame")
+            return
+        data = bytearray(frame['data'])
+        data[3::4] = b'\xff' * (len(data) // 4)  # bgr0 -> opaque bgra
+        buffer = (ctypes.c_char * len(data)).from_buffer(data)
+        self._freeze_buffer = buffer  # overlay-add reads this memory until the overlay is removed
+        self._send('overlay-add', FREEZE_OVERLAY_ID, 0, 0, f"&{ctypes.addressof(buffer)}", 0, 'bgra',
+                   frame['w'], frame['h'], frame['stride'],
+                   on_done=lambda e, r: self._on_freeze_shown(e, generation))
+
+    def _on_freeze_shown(self, error, generation):
+        if generation != self._freeze_generation: return
+        if error: self._freeze_failed(generation, error)
+        else: self.freeze_changed.emit(True)
+
+    def _freeze_failed(self, generation, error):
+        logger.warning(f"Freeze failed: {error}")
+        self._freeze_generation += 1
+        self._frozen, self._freeze_buffer = False, None
+        self.freeze_changed.emit(False)
+
+    def _release_freeze(self, generation):
+        if generation == self._freeze_generation: self._freeze_buffer = None
 
     def get_duration(self):
-        val = self._get_prop('duration', 0.0)
-        return val if val is not None else 0.0
+        return self.state.get('duration', 0.0)
 
     def get_position(self):
-        val = self._get_prop('time_pos', 0.0)
-        return val if val is not None else 0.0
+        return self.state.get('time_pos', 0.0)
+
+    def get_volume(self):
+        return self.state.get('volume', 100.0)
 
     @property
     def is_playing(self):
-        if not self.player: return False
-        try: return not self.player.pause
-        except: return False
+        return self.player is not None and not self.state.get('pause', False)
 
-    def _exec_cmd(self, func):
-        if self.player:
-            try: func()
-            except: self._handle_crash()
-
-    def _get_prop(self, prop, default):
-        if self.player:
-            try: return getattr(self.player, prop)
-            except: return default
-        return default
+    def _send(self, *command, on_done=None):
+        """Queues a command on the player without waiting for it. on_done(error, result) runs on mpv's event thread."""
+        if not self.player: return False
+        def done(error, result):
+            if tracer.enabled: tracer.instant(f"mpv {command[0]} done", 'mpv', error=error)
+            if error: logger.warning(f"mpv command {command} failed: {error}")
+            if on_done: on_done(error, result)
+        try:
+            # Fade steps send a command every frame: only format trace arguments while recording
+            if tracer.enabled:
+                with tracer.span(f"mpv {command[0]}", 'mpv', args=' '.join(map(str, command[1:]))):
+                    self.player.command_async(*command, callback=done)
+            else:
+                self.player.command_async(*command, callback=done)
+            return True
+        except Exception:
+            self._handle_crash()
+            return False
 
     def _handle_crash(self):
-        try:
-            if hasattr(self.player, 'terminate'): self.player.terminate()
-            self._initialize_player()
-        except: self._use_mock()
+        # A player that fails again while recovering is replaced by the simulation
+        if self._recovering: self._use_mock()
+        else: self._recover_player()
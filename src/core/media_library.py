@@ -0,0 +1,330 @@
+import os
+import re
+import sys
+import time
+import heapq
+import bisect
+import logging
+import threading
+import subprocess
+from PyQt6.QtCore import QObject, pyqtSignal, QFileSystemWatcher
+from PyQt6.QtGui import QImageReader
+from src.core.loudness_analyzer import find_ffmpeg
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTS = ('.mp4', '.mov', '.mkv', '.avi', '.webm')
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+AUDIO_EXTS = ('.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg')
+MEDIA_EXTS = VIDEO_EXTS + IMAGE_EXTS + AUDIO_EXTS
+
+_SPLIT_RE = re.compile(r"[^0-9a-z]+")
+_VIDEO_SIZE_RE = re.compile(r"Stream #.*?: Video: [^\n]*?, (\d{2,5})x(\d{2,5})[ ,\n]")
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+_NO_WINDOW = 0x08000000 if sys.platform == 'win32' else 0
+_PROBE_BATCH = 50
+
+def _kind(ext):
+    if ext in VIDEO_EXTS: return 'video'
+    if ext in IMAGE_EXTS: return 'image'
+    return 'audio'
+
+def _words(name):
+    return {t for t in _SPLIT_RE.split(os.path.splitext(name)[0].lower()) if t}
+
+def _trigrams(text):
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class LibraryEntry:
+    def __init__(self, path, size, mtime, meta=None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.name_lower = self.name.lower()
+        self.ext = os.path.splitext(self.name)[1].lower()
+        self.kind = _kind(self.ext)
+        self.size = size
+        self.mtime = mtime
+        self.meta = meta or {}
+        self.words = _words(self.name)
+        folder = os.path.basename(os.path.dirname(path)).lower()
+        self.tags = {self.kind, self.ext.lstrip('.')} | ({folder} if folder else set()) | set(self.meta.get('tags', ()))
+
+def _resolution_tags(width):
+    if width >= 3840: return {'4k'}
+    if width >= 1920: return {'hd'}
+    return set()
+
+def _probe(path, st):
+    """Cheap metadata that needs no decoding: file stats plus image dimensions from the header."""
+    entry = LibraryEntry(path, st.st_size, st.st_mtime)
+    if entry.kind == 'image':
+        size = QImageReader(path).size()
+        if size.isValid():
+            entry.meta.update(width=size.width(), height=size.height())
+            entry.tags |= _resolution_tags(size.width())
+    return entry
+
+def _probe_video(ffmpeg, entry):
+    """Entry with resolution, duration and resolution tags read by ffmpeg from the container headers, or None.
+
+    Spawns a process per file, so it only runs on worker threads.
+    """
+    try:
+        proc = subprocess.run([ffmpeg, '-nostdin', '-hide_banner', '-i', entry.path], stdin=subprocess.DEVNULL,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors='replace',
+                              timeout=10, creationflags=_NO_WINDOW)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.debug(f"Could not probe {entry.path}: {e}")
+        return None
+    # Without an output ffmpeg exits with an error after printing the input's streams
+    size, duration = _VIDEO_SIZE_RE.search(proc.stderr), _DURATION_RE.search(proc.stderr)
+    if not size: return None
+    width, height = int(size.group(1)), int(size.group(2))
+    meta = {'width': width, 'height': height, 'tags': sorted(_resolution_tags(width))}
+    if duration:
+        h, m, sec = duration.groups()
+        meta['duration'] = int(h) * 3600 + int(m) * 60 + float(sec)
+    return LibraryEntry(entry.path, entry.size, entry.mtime, meta)
+
+def _scan_dir(directory, recursive):
+    entries, subdirs = [], []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        subdirs.extend(os.path.join(root, d) for d in dirs)
+        for f in files:
+            if os.path.splitext(f)[1].lower() not in MEDIA_EXTS: continue
+            path = os.path.join(root, f)
+            try: entries.append(_probe(path, os.stat(path)))
+            except OSError: pass
+        if not recursive: break
+    return entries, subdirs
+
+class MediaLibrary(QObject):
+    """Incremental search index over media in watched folders.
+
+    Filenames are split into words with a posting set per word. Prefix terms ("intro vid") are
+    resolved against a sorted vocabulary, tag filters ("tag:4k" or "#keynote") against tag postings,
+    and misspelled terms fall back to trigram matching over the vocabulary, so query cost depends on
+    the number of distinct words rather than files. The index is only mutated on the GUI thread;
+    recursive scans (added folders and subfolders that appear later) run on a worker thread and
+    are merged when they finish. Video resolution and duration are probed with ffmpeg afterwards,
+    also off the GUI thread, and merged in batches, so files are searchable before they are probed.
+    """
+    index_changed = pyqtSignal()
+    _scan_finished = pyqtSignal(str, str, object, object)
+    _probe_finished = pyqtSignal(object)
+
+    def __init__(self, ffmpeg=None):
+        super().__init__()
+        self.ffmpeg = ffmpeg or find_ffmpeg()
+        self._entries = {}
+        self._postings = {}  # word -> set of paths
+        self._vocab = []  # sorted words
+        self._trigram_index = {}  # trigram -> set of words
+        self._tag_index = {}
+        self._extra_tags = {}
+        self._roots = set()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._scan_finished.connect(self._merge_scan)
+        self._probe_finished.connect(self._merge_probed)
+        if not self.ffmpeg: logger.warning("ffmpeg not found: videos are indexed without resolution tags")
+
+    # --- Folders ---
+
+    def watched_folders(self):
+        return sorted(self._roots)
+
+    def add_folder(self, folder):
+        folder = os.path.abspath(folder)
+        if folder in self._roots or not os.path.isdir(folder): return
+        self._roots.add(folder)
+        self._scan(folder, folder)
+
+    def _scan(self, root, folder):
+        """Indexes folder (inside watched root) recursively on a worker thread."""
+        self._watcher.addPath(folder)
+        threading.Thread(target=self._scan_worker, args=(root, folder), name="LibraryScan", daemon=True).start()
+
+    def remove_folder(self, folder):
+        folder = os.path.abspath(folder)
+        self._roots.discard(folder)
+        prefix = folder + os.sep
+        for d in [d for d in self._watcher.directories() if d == folder or d.startswith(prefix)]:
+            self._watcher.removePath(d)
+        for path in [p for p in self._entries if p.startswith(prefix)]: self._remove(path)
+        self.index_changed.emit()
+
+    def _scan_worker(self, root, folder):
+        started = time.perf_counter()
+        entries, subdirs = _scan_dir(folder, recursive=True)
+        logger.info(f"Scanned {folder}: {len(entries)} files in {time.perf_counter() - started:.2f}s")
+        self._scan_finished.emit(root, folder, entries, subdirs)
+        self._probe_worker([e for e in entries if e.kind == 'video'])
+
+    def _probe_videos(self, entries):
+        videos = [e for e in entries if e.kind == 'video']
+        if videos and self.ffmpeg:
+            threading.Thread(target=self._probe_worker, args=(videos,), name="LibraryProbe", daemon=True).start()
+
+    def _probe_worker(self, videos):
+        if not self.ffmpeg: return
+        batch = []
+        for entry in videos:
+            probed = _probe_video(self.ffmpeg, entry)
+            if probed: batch.append(probed)
+            if len(batch) >= _PROBE_BATCH:
+                self._probe_finished.emit(batch)
+                batch = []
+        if batch: self._probe_finished.emit(batch)
+
+    def _merge_probed(self, entries):
+        # Only if the file is still indexed and unchanged since it was probed
+        for entry in entries:
+            known = self._entries.get(entry.path)
+            if known and known.size == entry.size and known.mtime == entry.mtime: self._add(entry)
+        self.index_changed.emit()
+
+    def _merge_scan(self, root, folder, entries, subdirs):
+        if root not in self._roots: return
+        if subdirs: self._watcher.addPaths(subdirs)
+        for entry in entries: self._add(entry, bulk=True)
+        self._vocab = sorted(self._postings)
+        self.index_changed.emit()
+
+    def _on_directory_changed(self, directory):
+        """Re-lists only the directory that changed and applies the difference to the index."""
+        if not os.path.isdir(directory):
+            prefix = directory + os.sep
+            for path in [p for p in self._entries if p.startswith(prefix)]: self._remove(path)
+            self._watcher.removePath(directory)
+            self.index_changed.emit()
+            return
+
+        present = {}
+        watched = set(self._watcher.directories())
+        root = next((r for r in self._roots if directory == r or directory.startswith(r + os.sep)), None)
+        try:
+            with os.scandir(directory) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        if not e.name.startswith('.') and e.path not in watched and root:
+                            # A new subfolder can be large (a copied-in show): walk it off the GUI thread.
+                            # Watching it first means later changes are not scanned a second time.
+                            self._scan(root, e.path)
+                    elif os.path.splitext(e.name)[1].lower() in MEDIA_EXTS:
+                        present[e.path] = e
+        except OSError as e:
+            logger.warning(f"Could not rescan {directory}: {e}")
+            return
+
+        for path in [p for p in self._entries if os.path.dirname(p) == directory and p not in present]:
+            self._remove(path)
+        changed = []
+        for path, e in present.items():
+            try: st = e.stat()
+            except OSError: continue
+            known = self._entries.get(path)
+            if known and known.size == st.st_size and known.mtime == st.st_mtime: continue
+            if known: self._remove(path)
+            entry = _probe(path, st)
+            self._add(entry)
+            changed.append(entry)
+        self._probe_videos(changed)
+        self.index_changed.emit()
+
+    # --- Index maintenance ---
+
+    def _add(self, entry, bulk=False):
+        """Indexes entry; with bulk=True the caller must rebuild _vocab afterwards."""
+        if entry.path in self._entries: self._remove(entry.path)
+        entry.tags |= self._extra_tags.get(entry.path, set())
+        self._entries[entry.path] = entry
+        for word in entry.words:
+            paths = self._postings.get(word)
+            if paths is None:
+                paths = self._postings[word] = set()
+                if not bulk: bisect.insort(self._vocab, word)
+                for tri in _trigrams(word): self._trigram_index.setdefault(tri, set()).add(word)
+            paths.add(entry.path)
+        for tag in entry.tags: self._tag_index.setdefault(tag, set()).add(entry.path)
+
+    def _remove(self, path):
+        entry = self._entries.pop(path, None)
+        if not entry: return
+        for word in entry.words:
+            self._discard(self._postings, word, path)
+            if word not in self._postings:
+                i = bisect.bisect_left(self._vocab, word)
+                if i < len(self._vocab) and self._vocab[i] == word: del self._vocab[i]
+                for tri in _trigrams(word): self._discard(self._trigram_index, tri, word)
+        for tag in entry.tags: self._discard(self._tag_index, tag, path)
+
+    @staticmethod
+    def _discard(index, key, path):
+        paths = index.get(key)
+        if paths is None: return
+        paths.discard(path)
+        if not paths: del index[key]
+
+    def add_tags(self, path, *tags):
+        tags = {t.lower() for t in tags}
+        self._extra_tags.setdefault(path, set()).update(tags)
+        entry = self._entries.get(path)
+        if entry:
+            entry.tags |= tags
+            for tag in tags: self._tag_index.setdefault(tag, set()).add(path)
+
+    def tags(self):
+        return sorted(self._tag_index)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # --- Search ---
+
+    def _prefix(self, term):
+        i = bisect.bisect_left(self._vocab, term)
+        found = set()
+        while i < len(self._vocab) and self._vocab[i].startswith(term):
+            found |= self._postings[self._vocab[i]]
+            i += 1
+        return found
+
+    def _fuzzy(self, term):
+        """Paths containing a word similar to term (trigram Jaccard over the vocabulary)."""
+        grams = _trigrams(term)
+        shared = {}
+        for tri in grams:
+            for word in self._trigram_index.get(tri, ()): shared[word] = shared.get(word, 0) + 1
+        found = set()
+        for word, n in shared.items():
+            if n / (len(grams) + len(word) + 1 - n) >= 0.3: found |= self._postings[word]
+        return found
+
+    def search(self, query, limit=50):
+        """Returns matching LibraryEntry objects, best first."""
+        terms, tags = [], []
+        for part in query.lower().split():
+            if part.startswith('tag:'): tags.append(part[4:])
+            elif part.startswith('#'): tags.append(part[1:])
+            else: terms.extend(t for t in _SPLIT_RE.split(part) if t)
+
+        candidates = None
+        for tag in filter(None, tags):
+            matched = self._tag_index.get(tag, set())
+            candidates = matched if candidates is None else candidates & matched
+
+        if terms:
+            found = candidates
+            for term in terms:
+                matched = self._prefix(term) or self._fuzzy(term)
+                found = matched if found is None else found & matched
+                if not found: return []
+            phrase = ' '.join(terms)
+            entries = [self._entries[p] for p in found]
+            return heapq.nsmallest(limit, entries, key=lambda e: (not e.name_lower.startswith(phrase), len(e.name), e.path))
+
+        if candidates is None: return []
+        return heapq.nsmallest(limit, (self._entries[p] for p in candidates), key=lambda e: e.name_lower)
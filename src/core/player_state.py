@@ -0,0 +1,42 @@
+import threading
+from types import MappingProxyType
+
+# mpv property -> state key
+OBSERVED_PROPERTIES = {
+    'time-pos': 'time_pos', 'duration': 'duration', 'pause': 'pause', 'volume': 'volume',
+    'eof-reached': 'eof_reached', 'path': 'path', 'track-list': 'track_list',
+    'frame-drop-count': 'frame_drop_count', 'decoder-frame-drop-count': 'decoder_frame_drop_count',
+    'vo-delayed-frame-count': 'vo_delayed_frame_count'
+}
+
+DEFAULT_STATE = {
+    'time_pos': None, 'duration': None, 'pause': False, 'volume': 100.0,
+    'eof_reached': False, 'path': None, 'track_list': [],
+    'frame_drop_count': 0, 'decoder_frame_drop_count': 0, 'vo_delayed_frame_count': 0
+}
+
+class PlayerStateStore:
+    """Latest player state, written by mpv property observers and read lock-free from any thread.
+
+    Every update publishes a new read-only mapping, so a snapshot never changes under its reader.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = MappingProxyType(dict(DEFAULT_STATE))
+
+    def update(self, key, value):
+        with self._lock:
+            state = dict(self._state)
+            state[key] = value
+            self._state = MappingProxyType(state)
+
+    def reset(self):
+        with self._lock:
+            self._state = MappingProxyType(dict(DEFAULT_STATE))
+
+    def snapshot(self):
+        return self._state
+
+    def get(self, key, default=None):
+        value = self._state.get(key)
+        return default if value is None else value
@@ -1,10 +1,12 @@
 import os
 from PyQt6.QtCore import QAbstractListModel, Qt, pyqtSignal
+from src.core.show_bundle import ShowBundle
+from src.utils.tracer import tracer
 
 class PlaylistItem:
-    def __init__(self, filepath):
+    def __init__(self, filepath, filename=None):
         self.filepath = filepath
-        self.filename = os.path.basename(filepath)
+        self.filename = filename or os.path.basename(filepath)
 
 class PlaylistManager(QAbstractListModel):
     current_item_changed = pyqtSignal(object)
@@ -29,10 +31,26 @@ class PlaylistManager(QAbstractListModel):
         self.endInsertRows()
         if self._current_index == -1: self.set_current_index(0)
 
+    def add_bundle(self, bundle_path):
+        bundle = ShowBundle.open(bundle_path)
+        items = [PlaylistItem(bundle.uri(name), name) for name in bundle.names()]
+        if not items: return []
+        self.beginInsertRows(self.index(0), len(self._items), len(self._items) + len(items) - 1)
+        self._items.extend(items)
+        self.endInsertRows()
+        if self._current_index == -1: self.set_current_index(0)
+        return items
+
+    def items(self): return list(self._items)
+
+    @property
+    def current_index(self): return self._current_index
+
     def set_current_index(self, index):
         if 0 <= index < len(self._items):
             self._current_index = index
-            self.current_item_changed.emit(self._items[index])
+            with tracer.span("PlaylistManager.current_item_changed", 'playlist', index=index):
+                self.current_item_changed.emit(self._items[index])
 
     def next(self):
         if self._current_index + 1 < len(self._items):
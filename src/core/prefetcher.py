@@ -0,0 +1,155 @@
+import os
+import sys
+import time
+import ctypes
+import logging
+import platform
+import threading
+from collections import deque
+from PyQt6.QtCore import QObject, pyqtSignal, Qt
+from src.core.show_bundle import ShowBundle, is_bundle_uri, parse_uri
+
+logger = logging.getLogger(__name__)
+
+# ioprio_set(2) syscall numbers
+_IOPRIO_SYSCALL = {'x86_64': 251, 'amd64': 251, 'aarch64': 30, 'arm64': 30, 'i386': 289, 'i686': 289}
+_IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_VALUES = {'idle': 3 << _IOPRIO_CLASS_SHIFT, 'low': (2 << _IOPRIO_CLASS_SHIFT) | 7}
+_THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+
+_READ_CHUNK = 1024 * 1024
+
+def _lower_io_priority(level):
+    """Applies an I/O priority to the calling thread. 'normal' leaves it untouched."""
+    if level == 'normal': return
+    try:
+        if sys.platform == 'win32':
+            k32 = ctypes.windll.kernel32
+            k32.SetThreadPriority(k32.GetCurrentThread(), _THREAD_MODE_BACKGROUND_BEGIN)
+        elif sys.platform.startswith('linux'):
+            nr = _IOPRIO_SYSCALL.get(platform.machine().lower())
+            # IOPRIO_WHO_PROCESS with pid 0 targets the calling thread
+            if nr: ctypes.CDLL(None, use_errno=True).syscall(nr, 1, 0, _IOPRIO_VALUES[level])
+    except Exception as e:
+        logger.debug(f"Could not lower prefetch I/O priority: {e}")
+
+class Prefetcher(QObject):
+    """Warms the page cache for the head of the next few playlist items.
+
+    latency_saved and saved_seconds report how long the whole warm read (head and tail) took on a
+    cold cache. That is an upper bound: the demuxer's first reads after a cut cover less than that.
+    """
+    latency_saved = pyqtSignal(str, float)
+
+    def __init__(self, playlist_manager, lookahead=3, head_bytes=16 * 1024 ** 2, tail_bytes=1024 ** 2,
+                 budget_bytes=64 * 1024 ** 2, io_priority='idle', resolve=None):
+        super().__init__()
+        self.playlist_manager = playlist_manager
+        self.lookahead = lookahead
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.budget_bytes = budget_bytes
+        self.io_priority = io_priority
+        self.resolve = resolve or (lambda path: path)
+        self.saved_seconds = 0.0
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._jobs = deque()
+        self._generation = 0
+        self._warmed = {}  # playlist filepath -> seconds the cold read took
+        self._stopping = False
+
+        # Queued so the cut's own slots (the player command) run first; replanning can wait a turn
+        self.playlist_manager.current_item_changed.connect(self._on_current_item_changed,
+                                                           Qt.ConnectionType.QueuedConnection)
+        self.playlist_manager.rowsInserted.connect(self._plan)
+        self._thread = threading.Thread(target=self._run, name="Prefetcher", daemon=True)
+        self._thread.start()
+
+    def stats(self):
+        with self._lock:
+            return {'warmed_items': len(self._warmed), 'saved_seconds': self.saved_seconds,
+                    'pending_jobs': len(self._jobs)}
+
+    def shutdown(self):
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=2)
+
+    def _on_current_item_changed(self, item):
+        with self._lock:
+            saved = self._warmed.pop(item.filepath, None) if item else None
+            if saved is not None: self.saved_seconds += saved
+        self._plan()
+
+        if saved is not None:
+            logger.info(f"Prefetch saved up to {saved * 1000:.0f} ms cold start on {item.filename} "
+                        f"(total up to {self.saved_seconds:.2f}s)")
+            self.latency_saved.emit(item.filepath, saved)
+
+    def _plan(self, *_):
+        with self._lock:
+            # Replanning cancels whatever was being warmed for the old position
+            self._generation += 1
+            self._jobs.clear()
+            items = self.playlist_manager.items()
+            start = self.playlist_manager.current_index + 1
+            budget = self.budget_bytes
+            for upcoming in items[start:start + self.lookahead]:
+                if budget <= 0: break
+                if upcoming.filepath in self._warmed: continue
+                self._jobs.append((self._generation, upcoming.filepath, min(self.head_bytes, budget)))
+                budget -= self.head_bytes + self.tail_bytes
+        self._wake.set()
+
+    def _run(self):
+        _lower_io_priority(self.io_priority)
+        while not self._stopping:
+            with self._lock:
+                job = self._jobs.popleft() if self._jobs else None
+            if job is None:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            generation, filepath, head = job
+            try:
+                elapsed = self._warm(generation, filepath, head)
+            except (OSError, KeyError, ValueError) as e:
+                logger.debug(f"Prefetch skipped {filepath}: {e}")
+                continue
+            if elapsed is not None:
+                with self._lock:
+                    if generation == self._generation: self._warmed[filepath] = elapsed
+
+    def _cancelled(self, generation):
+        return self._stopping or generation != self._generation
+
+    def _warm(self, generation, filepath, head):
+        """Reads the head and tail of filepath; returns the time taken, or None if cancelled."""
+        path = self.resolve(filepath)
+        if is_bundle_uri(path):
+            bundle_path, name = parse_uri(path)
+            start, size = ShowBundle.open(bundle_path).entry_range(name)
+            path = bundle_path
+        else:
+            start, size = 0, os.path.getsize(path)
+
+        ranges = [(start, min(head, size))]
+        if size > head and self.tail_bytes:
+            tail = min(self.tail_bytes, size - head)
+            ranges.append((start + size - tail, tail))
+
+        started = time.perf_counter()
+        with open(path, 'rb', buffering=0) as f:
+            if hasattr(os, 'posix_fadvise'):
+                for offset, length in ranges:
+                    os.posix_fadvise(f.fileno(), offset, length, os.POSIX_FADV_WILLNEED)
+            for offset, length in ranges:
+                f.seek(offset)
+                while length > 0:
+                    if self._cancelled(generation): return None
+                    chunk = f.read(min(_READ_CHUNK, length))
+                    if not chunk: break
+                    length -= len(chunk)
+        return time.perf_counter() - started
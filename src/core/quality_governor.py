@@ -0,0 +1,114 @@
+import time
+import logging
+from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from src.core.media_controller import PLAYER_OPTION_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+# Ordered from best looking to cheapest. Level 0 is the player's own settings (nothing is set); the
+# lower levels all set the same keys, and returning to level 0 restores their startup values.
+QUALITY_LEVELS = [
+    ('full', {}),
+    ('balanced', {'scale': 'spline36', 'cscale': 'bilinear', 'dscale': 'bilinear', 'correct-downscaling': 'no',
+                  'deband': 'no', 'framedrop': 'vo', 'vd-lavc-skiploopfilter': 'default', 'vd-lavc-fast': 'no'}),
+    ('fast', {'scale': 'bilinear', 'cscale': 'bilinear', 'dscale': 'bilinear', 'correct-downscaling': 'no',
+              'deband': 'no', 'framedrop': 'vo', 'vd-lavc-skiploopfilter': 'nonref', 'vd-lavc-fast': 'no'}),
+    ('survival', {'scale': 'bilinear', 'cscale': 'bilinear', 'dscale': 'bilinear', 'correct-downscaling': 'no',
+                  'deband': 'no', 'framedrop': 'decoder+vo', 'vd-lavc-skiploopfilter': 'all', 'vd-lavc-fast': 'yes'}),
+]
+
+# Read by the decoder when it is created, so a change only shows from the next file
+DECODER_OPTIONS = {name: PLAYER_OPTION_DEFAULTS[name] for name in ('vd-lavc-skiploopfilter', 'vd-lavc-fast')}
+
+class QualityGovernor(QObject):
+    """Steps rendering quality down when frames are dropped or late, and back up when there is headroom.
+
+    Reads drop/delay counters from the player state store once per interval. Stepping down needs
+    `degrade_after` bad windows in a row; stepping up needs `recover_after` clean windows, and that
+    requirement doubles each time a step up is followed by a quick step back down, so the governor
+    settles instead of oscillating.
+    """
+    quality_changed = pyqtSignal(str, str)
+
+    def __init__(self, media_controller, interval_ms=1000, drop_threshold=2, degrade_after=2, recover_after=30,
+                 cooldown=5.0, max_recover_after=600):
+        super().__init__()
+        self.media_controller = media_controller
+        self.drop_threshold = drop_threshold
+        self.degrade_after = degrade_after
+        self.recover_after = recover_after
+        self.max_recover_after = max_recover_after
+        self.cooldown = cooldown
+        self.level = 0
+        self.history = []
+
+        self._interval = interval_ms / 1000.0
+        self._last_counters = None
+        self._bad_windows = 0
+        self._good_windows = 0
+        self._cooldown_until = 0.0
+        self._last_step_up = None
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._sample)
+        self._timer.start(interval_ms)
+
+    @property
+    def level_name(self):
+        return QUALITY_LEVELS[self.level][0]
+
+    def set_enabled(self, enabled):
+        if enabled: self._timer.start()
+        else: self._timer.stop()
+
+    def _counters(self, state):
+        return (state.get('frame_drop_count') or 0) + (state.get('decoder_frame_drop_count') or 0), \
+               state.get('vo_delayed_frame_count') or 0
+
+    def _sample(self):
+        state = self.media_controller.state.snapshot()
+        counters = self._counters(state)
+        last, self._last_counters = self._last_counters, counters
+        if last is None or state.get('pause') or state.get('eof_reached') or not state.get('path'): return
+
+        dropped, delayed = counters[0] - last[0], counters[1] - last[1]
+        if dropped < 0 or delayed < 0: return  # counters restart with every file
+
+        now = time.monotonic()
+        if dropped + delayed >= self.drop_threshold:
+            self._bad_windows += 1
+            self._good_windows = 0
+            if self._bad_windows >= self.degrade_after and now >= self._cooldown_until:
+                self._step(+1, f"{dropped} dropped, {delayed} delayed frames/interval", now)
+        elif dropped + delayed == 0:
+            self._good_windows += 1
+            self._bad_windows = 0
+            if self._good_windows >= self.recover_after and now >= self._cooldown_until:
+                self._step(-1, f"no dropped frames for {self._good_windows} intervals", now)
+        else:
+            self._bad_windows = self._good_windows = 0
+
+    def _step(self, direction, reason, now):
+        previous = QUALITY_LEVELS[self.level][1]
+        target = self.level + direction
+        if not 0 <= target < len(QUALITY_LEVELS): return
+        if direction > 0 and self._last_step_up and now - self._last_step_up < self.recover_after * self._interval:
+            # The last step up did not hold: wait longer before trying again
+            self.recover_after = min(self.recover_after * 2, self.max_recover_after)
+        self._last_step_up = now if direction < 0 else None
+        self.level = target
+        self._bad_windows = self._good_windows = 0
+        self._cooldown_until = now + self.cooldown
+        self._apply(previous, reason)
+
+    def _apply(self, previous, reason):
+        name, options = QUALITY_LEVELS[self.level]
+        if options: self.media_controller.apply_options(options)
+        else:
+            kept = self.media_controller.restore_default_options()
+            if kept: reason += f"; could not restore {', '.join(kept)}"
+        if any(options.get(k, d) != previous.get(k, d) for k, d in DECODER_OPTIONS.items()):
+            reason += "; decoder settings apply from the next file"
+        self.history.append((time.time(), name, reason))
+        logger.warning(f"Render quality -> {name}: {reason}")
+        self.quality_changed.emit(name, reason)
@@ -1,26 +1,72 @@
+import logging
 from PyQt6.QtGui import QGuiApplication
-from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger(__name__)
 
 class ScreenManager(QObject):
+    """Tracks the presentation screen by name, so it survives monitors being plugged in or out.
+
+    When the chosen screen disappears the output is remapped to the best remaining screen (a
+    secondary one if any); when it comes back it is taken again. presentation_screen_changed is
+    emitted with the new QScreen whenever the mapping changes, and screens_changed on any hotplug.
+    """
+    screens_changed = pyqtSignal()
+    presentation_screen_changed = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self._app = QGuiApplication.instance()
         self._screens = self._app.screens()
-        self._presentation_screen_index = -1
+        self._preferred_name = None  # the operator's choice
+        self._presentation_screen = None  # where output is right now
+        self._presentation_name = None
         self._app.screenAdded.connect(self._update)
-        self._app.screenRemoved.connect(self._update)
+        self._app.screenRemoved.connect(lambda screen: self._update(removed=screen))
 
-    def _update(self, _=None):
-        self._screens = self._app.screens()
+    def _update(self, _=None, removed=None):
+        # The removed screen may still be listed while its signal is delivered
+        self._screens = [s for s in self._app.screens() if s is not removed]
+        current = self._presentation_screen if self._presentation_screen in self._screens else None
+        changed = False
+        if self._preferred_name is not None:
+            screen = self._find(self._preferred_name) or current or self._fallback()
+            if screen is not self._presentation_screen:
+                logger.warning(f"Presentation screen {self._presentation_name!r} -> {screen.name() if screen else None!r}")
+                self._set_current(screen)
+                changed = True
+        self.screens_changed.emit()
+        if changed: self.presentation_screen_changed.emit(self._presentation_screen)
+
+    def _set_current(self, screen):
+        self._presentation_screen = screen
+        self._presentation_name = screen.name() if screen else None
+
+    def _find(self, name):
+        return next((s for s in self._screens if s.name() == name), None)
+
+    def _fallback(self):
+        primary = self._app.primaryScreen()
+        secondary = [s for s in self._screens if s is not primary]
+        if secondary: return secondary[0]
+        return primary if primary in self._screens else (self._screens[0] if self._screens else None)
 
     def get_available_screens(self):
         return self._screens
 
     def set_presentation_screen(self, index):
         if 0 <= index < len(self._screens):
-            self._presentation_screen_index = index
+            screen = self._screens[index]
+            self._preferred_name = screen.name()
+            if screen is not self._presentation_screen:
+                self._set_current(screen)
+                self.presentation_screen_changed.emit(screen)
+
+    def get_presentation_screen_index(self):
+        try: return self._screens.index(self._presentation_screen)
+        except ValueError: return -1
 
     def get_presentation_screen_geometry(self):
-        if 0 <= self._presentation_screen_index < len(self._screens):
-            return self._screens[self._presentation_screen_index].geometry()
+        if self._presentation_screen in self._screens:
+            return self._presentation_screen.geometry()
         return None
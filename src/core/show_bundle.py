@@ -0,0 +1,218 @@
+import os
+import mmap
+import ctypes
+import json
+import struct
+import shutil
+import logging
+import threading
+from urllib.parse import quote, unquote
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_EXT = '.pvshow'
+BUNDLE_PROTOCOL = 'pvshow'
+BUNDLE_MAGIC = b'PVSHOW\x00\x01'
+BUNDLE_VERSION = 1
+
+# magic, version, index length, data offset
+_HEADER = struct.Struct('<8sIIQ')
+_ALIGN = 4096
+_COPY_CHUNK = 8 * 1024 * 1024
+
+class _PyBuffer(ctypes.Structure):
+    # Py_buffer; obj is left as a raw pointer, PyBuffer_Release drops the reference it holds
+    _fields_ = [('buf', ctypes.c_void_p), ('obj', ctypes.c_void_p), ('len', ctypes.c_ssize_t),
+                ('itemsize', ctypes.c_ssize_t), ('readonly', ctypes.c_int), ('ndim', ctypes.c_int),
+                ('format', ctypes.c_char_p), ('shape', ctypes.c_void_p), ('strides', ctypes.c_void_p),
+                ('suboffsets', ctypes.c_void_p), ('internal', ctypes.c_void_p)]
+
+_PyObject_GetBuffer = ctypes.pythonapi.PyObject_GetBuffer
+_PyObject_GetBuffer.argtypes = [ctypes.py_object, ctypes.POINTER(_PyBuffer), ctypes.c_int]
+_PyObject_GetBuffer.restype = ctypes.c_int
+_PyBuffer_Release = ctypes.pythonapi.PyBuffer_Release
+_PyBuffer_Release.argtypes = [ctypes.POINTER(_PyBuffer)]
+_PyBuffer_Release.restype = None
+_PyBUF_SIMPLE = 0
+
+def _align(value):
+    return (value + _ALIGN - 1) // _ALIGN * _ALIGN
+
+def is_bundle_file(path):
+    return isinstance(path, str) and path.lower().endswith(BUNDLE_EXT)
+
+def is_bundle_uri(uri):
+    return isinstance(uri, str) and uri.startswith(BUNDLE_PROTOCOL + '://')
+
+def make_uri(bundle_path, name):
+    return f"{BUNDLE_PROTOCOL}://{quote(os.path.abspath(bundle_path), safe='')}/{quote(name, safe='')}"
+
+def parse_uri(uri):
+    if not is_bundle_uri(uri): raise ValueError(f"Not a show bundle URI: {uri}")
+    bundle_part, _, name_part = uri[len(BUNDLE_PROTOCOL) + 3:].partition('/')
+    if not bundle_part or not name_part: raise ValueError(f"Malformed show bundle URI: {uri}")
+    return unquote(bundle_part), unquote(name_part)
+
+class BundleStream:
+    """Read-only stream over one bundle entry as slices of the bundle mmap (python-mpv protocol object).
+
+    Only used where the reader is Python (the simulated player); libmpv reads bundles through
+    native callbacks that copy straight from the mapping, see ShowBundle.acquire_range.
+    """
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    @property
+    def size(self):
+        return len(self._view) if self._view is not None else 0
+
+    def read(self, size):
+        if self._view is None: return b''
+        chunk = self._view[self._pos:self._pos + size]
+        self._pos += len(chunk)
+        return chunk
+
+    def seek(self, pos):
+        self._pos = max(0, min(pos, self.size))
+        return self._pos
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+
+class ShowBundle:
+    """Single-file show: a JSON index followed by page-aligned, concatenated media.
+
+    Bundles are shared per path and used from the GUI, the player's stream thread, the prefetcher
+    and the thumbnail worker; _lock guards the open-bundle table and the native reader counts.
+    """
+    _open_bundles = {}
+    _lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_len, data_offset = _HEADER.unpack_from(self._map, 0)
+            if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+                raise ValueError(f"Not a supported show bundle: {path}")
+            index = json.loads(self._map[_HEADER.size:_HEADER.size + index_len].decode('utf-8'))
+            # A read-only buffer export gives native readers the mapping's address; a copy-on-write
+            # view would do the same but commits page-file space for the whole bundle on Windows
+            self._buffer = _PyBuffer()
+            _PyObject_GetBuffer(self._map, ctypes.byref(self._buffer), _PyBUF_SIMPLE)
+        except Exception:
+            self._file.close()
+            raise
+        self._native_readers = 0
+        self._data_offset = data_offset
+        self._entries = {e['name']: (e['offset'], e['size']) for e in index['entries']}
+        self._names = [e['name'] for e in index['entries']]
+
+    @classmethod
+    def open(cls, path):
+        path = os.path.abspath(path)
+        with cls._lock:
+            bundle = cls._open_bundles.get(path)
+            if bundle is None:
+                bundle = cls._open_bundles[path] = cls(path)
+                logger.info(f"Opened show bundle {path} ({len(bundle._names)} entries)")
+        return bundle
+
+    def names(self):
+        return list(self._names)
+
+    def uri(self, name):
+        return make_uri(self.path, name)
+
+    def entry_range(self, name):
+        offset, size = self._entries[name]
+        return self._data_offset + offset, size
+
+    def view(self, name):
+        start, size = self.entry_range(name)
+        return memoryview(self._map)[start:start + size]
+
+    def open_stream(self, name):
+        return BundleStream(self.view(name))
+
+    def acquire_range(self, name):
+        """(address, size) of an entry inside the mapping, for native readers; pair with release_range()."""
+        start, size = self.entry_range(name)
+        with ShowBundle._lock:
+            if not self._buffer.buf: raise ValueError(f"Show bundle {self.path} is closed")
+            self._native_readers += 1
+            return self._buffer.buf + start, size
+
+    def release_range(self):
+        with ShowBundle._lock: self._native_readers -= 1
+
+    def close(self):
+        with ShowBundle._lock:
+            if self._native_readers:
+                logger.warning(f"Show bundle {self.path} is still being read by the player")
+                return
+            if ShowBundle._open_bundles.get(self.path) is self: del ShowBundle._open_bundles[self.path]
+            if self._buffer.buf:
+                _PyBuffer_Release(ctypes.byref(self._buffer))
+                self._buffer.buf = None
+        try: self._map.close()
+        except BufferError: logger.warning(f"Show bundle {self.path} still has open streams")
+        self._file.close()
+
+def open_uri_stream(uri):
+    """mpv stream protocol open callback; ValueError tells libmpv the URI cannot be opened."""
+    try:
+        bundle_path, name = parse_uri(uri)
+        return ShowBundle.open(bundle_path).open_stream(name)
+    except (OSError, KeyError) as e:
+        raise ValueError(f"Cannot open {uri}: {e}")
+
+def acquire_uri_range(uri):
+    """(bundle, address, size) for a pvshow:// URI; raises ValueError like open_uri_stream."""
+    try:
+        bundle_path, name = parse_uri(uri)
+        bundle = ShowBundle.open(bundle_path)
+        return (bundle,) + bundle.acquire_range(name)
+    except (OSError, KeyError, ValueError) as e:
+        raise ValueError(f"Cannot open {uri}: {e}")
+
+def read_uri(uri):
+    bundle_path, name = parse_uri(uri)
+    return ShowBundle.open(bundle_path).view(name)
+
+def write_bundle(path, files):
+    """Packs files into a bundle in playlist order. Written to a temp file and renamed on success."""
+    entries, seen, offset = [], set(), 0
+    for f in files:
+        name, n = os.path.basename(f), 1
+        while name in seen:
+            root, ext = os.path.splitext(os.path.basename(f))
+            name, n = f"{root} ({n}){ext}", n + 1
+        seen.add(name)
+        size = os.path.getsize(f)
+        entries.append({'name': name, 'offset': offset, 'size': size, 'source': f})
+        offset = _align(offset + size)
+
+    index = json.dumps({'entries': [{k: e[k] for k in ('name', 'offset', 'size')} for e in entries]}).encode('utf-8')
+    data_offset = _align(_HEADER.size + len(index))
+
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as out:
+            out.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index), data_offset))
+            out.write(index)
+            for e in entries:
+                out.seek(data_offset + e['offset'])
+                with open(e['source'], 'rb') as src:
+                    shutil.copyfileobj(src, out, _COPY_CHUNK)
+            out.truncate(out.tell())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+    logger.info(f"Wrote show bundle {path} ({len(entries)} entries)")
+    return [e['name'] for e in entries]
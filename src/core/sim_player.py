@@ -0,0 +1,398 @@
+import os
+import time
+import heapq
+import random
+import fnmatch
+import logging
+from PyQt6.QtCore import QTimer
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+SIM_WINDOW_SIZE = (64, 36)
+
+# Relative render cost of mpv options; a profile's drop_rate applies at cost 1.0 (the default settings)
+_RENDER_COST = {
+    'scale': {'bilinear': 0.6, 'spline36': 1.0, 'lanczos': 1.0, 'ewa_lanczossharp': 1.6},
+    'cscale': {'bilinear': 0.9, 'spline36': 1.0, 'lanczos': 1.0},
+    'deband': {True: 1.2},
+    'vd-lavc-skiploopfilter': {'nonref': 0.8, 'all': 0.5},
+}
+
+class SimulatedCrash(RuntimeError):
+    """Raised by commands after a 'crash' fault, like python-mpv's ShutdownError."""
+
+class VirtualClock:
+    """Simulated time with an ordered event queue. Nothing happens until it is advanced."""
+    def __init__(self):
+        self.now = 0.0
+        self._queue = []
+        self._seq = 0
+        self._cancelled = set()
+
+    def call_later(self, delay, fn, *args):
+        self._seq += 1
+        heapq.heappush(self._queue, (self.now + max(0.0, delay), self._seq, fn, args))
+        return self._seq
+
+    def cancel(self, handle):
+        self._cancelled.add(handle)
+
+    def advance(self, seconds):
+        """Runs everything due within the next `seconds`, in time then scheduling order."""
+        target = self.now + seconds
+        while self._queue and self._queue[0][0] <= target:
+            when, seq, fn, args = heapq.heappop(self._queue)
+            if seq in self._cancelled:
+                self._cancelled.discard(seq)
+                continue
+            self.now = when
+            fn(*args)
+        self.now = target
+
+    def run_pending(self):
+        self.advance(0.0)
+
+class SimFileProfile:
+    """Timing and behaviour of one simulated media file. Times are in virtual seconds."""
+    def __init__(self, duration=100.0, open_latency=0.05, seek_latency=0.02, drop_rate=0.0, fps=25.0,
+                 has_audio=True, has_video=True):
+        self.duration = duration
+        self.open_latency = open_latency
+        self.seek_latency = seek_latency
+        self.drop_rate = drop_rate
+        self.fps = fps
+        self.has_audio = has_audio
+        self.has_video = has_video
+
+IMAGE_PROFILE = SimFileProfile(duration=1.0, open_latency=0.02, fps=1.0, has_audio=False)
+
+class SimEvent:
+    def __init__(self, name, data=None):
+        self.name = name
+        self.data = data or {}
+
+    def as_dict(self):
+        return {'event': self.name, **self.data}
+
+class SimulatedMPV:
+    """Deterministic stand-in for mpv.MPV, used when libmpv is missing and for tests and load runs.
+
+    Follows mpv's event order: end-file (previous), start-file, file-loaded, property updates,
+    playback-restart, then time-pos ticks until eof-reached (keep-open pauses on the last frame).
+    With realtime=True the virtual clock is paced against the wall clock at `rate` times real speed;
+    otherwise the caller drives it with clock.advance().
+    """
+    def __init__(self, clock=None, profiles=None, default_profile=None, seed=0, realtime=True, rate=1.0,
+                 tick=0.1, **kwargs):
+        object.__setattr__(self, '_props', {
+            'pause': False, 'time-pos': None, 'duration': None, 'wid': None, 'speed': 1.0, 'volume': 100.0, 'volume-gain': 0.0,
+            'path': None, 'eof-reached': False, 'track-list': [], 'idle-active': True,
+            'frame-drop-count': 0, 'decoder-frame-drop-count': 0, 'vo-delayed-frame-count': 0,
+            # Render options at mpv's defaults
+            'scale': 'lanczos', 'cscale': 'lanczos', 'dscale': 'hermite', 'correct-downscaling': True, 'deband': False,
+            'framedrop': 'vo', 'vd-lavc-skiploopfilter': 'default', 'vd-lavc-fast': False,
+        })
+        self._props.update({k.replace('_', '-'): v for k, v in kwargs.items()})
+        self.clock = clock or VirtualClock()
+        self.profiles = dict(profiles or {})
+        self.default_profile = default_profile or SimFileProfile()
+        self.tick = tick
+        self._rng = random.Random(seed)
+        self._observers = {}
+        self._event_callbacks = {}
+        self._stream_protocols = {}
+        self._faults = []
+        self._osd_overlays = {}
+        self._overlays = {}
+        self._profile = None
+        self._load_token = 0
+        self._tick_handle = None
+        self._alive = True
+
+        self._timer = None
+        if realtime:
+            self._rate = rate
+            self._wall = time.perf_counter()
+            self._timer = QTimer()
+            self._timer.timeout.connect(self._pump)
+            self._timer.start(10)
+
+    # --- python-mpv surface ---
+
+    def __getattr__(self, name):
+        props = object.__getattribute__(self, '_props')
+        key = name.replace('_', '-')
+        if key in props: return props[key]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_') or name in ('clock', 'profiles', 'default_profile', 'tick'):
+            object.__setattr__(self, name, value)
+        else:
+            self._check_alive()
+            self._set_prop(name.replace('_', '-'), value)
+
+    def property_observer(self, name):
+        def decorator(func):
+            # Same as python-mpv, including the attribute it sets (so bound methods fail here too)
+            self.observe_property(name, func)
+            func.unobserve_mpv_properties = lambda: self.unobserve_property(name, func)
+            return func
+        return decorator
+
+    def observe_property(self, name, handler):
+        self._observers.setdefault(name, []).append(handler)
+        # mpv always delivers the current value right after observing
+        self.clock.call_later(0, handler, name, self._props.get(name))
+        self._kick()
+
+    def unobserve_property(self, name, handler):
+        if handler in self._observers.get(name, []): self._observers[name].remove(handler)
+
+    def event_callback(self, *event_types):
+        def decorator(func):
+            for t in event_types: self._event_callbacks.setdefault(t, []).append(func)
+            return func
+        return decorator
+
+    def register_stream_protocol(self, proto, open_fn=None):
+        def decorator(fn):
+            self._stream_protocols[proto] = fn
+            return fn
+        return decorator(open_fn) if open_fn else decorator
+
+    def command_async(self, name, *args, callback=None, **kwargs):
+        self._check_alive()
+        self.clock.call_later(0, self._run_command, name, args, kwargs, callback)
+        self._kick()
+
+    def command(self, name, *args, **kwargs):
+        self._check_alive()
+        return self._dispatch(name, args, kwargs)
+
+    def play(self, filename):
+        self.command('loadfile', filename)
+
+    def stop(self):
+        self.command('stop')
+
+    def seek(self, amount, reference='relative', precision='keyframes'):
+        self.command('seek', amount, reference)
+
+    @property
+    def osd_overlays(self):
+        """osd-overlay id -> (format, data, z) currently shown."""
+        return dict(self._osd_overlays)
+
+    @property
+    def overlays(self):
+        """overlay-add id -> (w, h, fmt) currently shown."""
+        return dict(self._overlays)
+
+    def clock_time(self):
+        return self.clock.now
+
+    def terminate(self):
+        self._alive = False
+        if self._timer: self._timer.stop()
+
+    # --- Simulation control ---
+
+    def set_profile(self, pattern, profile):
+        """Assigns a profile to files matching a glob pattern (checked in insertion order)."""
+        self.profiles[pattern] = profile
+
+    def inject_fault(self, kind, pattern='*', count=1, value=None):
+        """Faults: 'open-error' fails the next matching load, 'stall' adds `value` seconds to it,
+        'seek-stall' adds `value` seconds to the next seek, 'crash' kills the player on the next command."""
+        self._faults.append({'kind': kind, 'pattern': pattern, 'count': count, 'value': value})
+
+    def _take_fault(self, kind, path='*'):
+        for fault in self._faults:
+            if fault['kind'] == kind and fnmatch.fnmatch(path or '', fault['pattern']):
+                fault['count'] -= 1
+                if fault['count'] <= 0: self._faults.remove(fault)
+                return fault
+        return None
+
+    def _profile_for(self, path):
+        """Returns (profile, explicit); explicit profiles let tests load files that do not exist."""
+        for pattern, profile in self.profiles.items():
+            if fnmatch.fnmatch(path, pattern): return profile, True
+        if os.path.splitext(path)[1].lower() in IMAGE_EXTS: return IMAGE_PROFILE, False
+        return self.default_profile, False
+
+    # --- Internals ---
+
+    def _check_alive(self):
+        if not self._alive: raise SimulatedCrash("player core has been terminated")
+        if self._take_fault('crash'):
+            self.terminate()
+            raise SimulatedCrash("simulated player crash")
+
+    def _kick(self):
+        if self._timer: QTimer.singleShot(0, self._pump)
+
+    def _pump(self):
+        now = time.perf_counter()
+        elapsed, self._wall = now - self._wall, now
+        self.clock.advance(elapsed * self._rate)
+
+    def _set_prop(self, name, value):
+        if self._props.get(name) == value and name != 'time-pos': return
+        self._props[name] = value
+        for handler in list(self._observers.get(name, [])): handler(name, value)
+
+    def _fire(self, name, **data):
+        event = SimEvent(name, data)
+        for cb in list(self._event_callbacks.get(name, [])): cb(event)
+
+    def _run_command(self, name, args, kwargs, callback):
+        error, result = None, None
+        try: result = self._dispatch(name, args, kwargs)
+        except Exception as e: error = e
+        if callback: callback(error, result)
+
+    def _dispatch(self, name, args, kwargs):
+        handler = getattr(self, '_cmd_' + name.replace('-', '_'), None)
+        if handler is None: raise ValueError(f"unsupported command: {name}")
+        return handler(*args, **kwargs)
+
+    def _cmd_set(self, prop, value):
+        current = self._props.get(prop)
+        if value in ('yes', 'no'): value = value == 'yes'
+        elif isinstance(current, (int, float)) and not isinstance(current, bool): value = type(current)(float(value))
+        self._set_prop(prop, value)
+        if prop == 'vid' and value and self._profile and self._profile.has_video:
+            # Re-selecting the video track re-creates the VO (used to move output to a new wid)
+            token = self._load_token
+            self.clock.call_later(self._profile.seek_latency,
+                                  lambda: token == self._load_token and self._fire('video-reconfig'))
+
+    def _cmd_cycle(self, prop):
+        self._set_prop(prop, not self._props.get(prop))
+
+    def _cmd_loadfile(self, path, mode='replace', *rest, **options):
+        self._end_file('stop')
+        self._load_token += 1
+        token = self._load_token
+        self._set_prop('idle-active', False)
+        self._fire('start-file')
+
+        profile, explicit = self._profile_for(path)
+        error = self._take_fault('open-error', path)
+        proto = path.split('://', 1)[0] if '://' in path else None
+        if proto in self._stream_protocols:
+            try: self._stream_protocols[proto](path).close()
+            except ValueError: error = True
+        elif proto is None and not explicit and not os.path.exists(path):
+            error = True
+
+        # Per-file options, as mpv's "start=12.5,pause=yes" argument or python-mpv keywords
+        for opt in (o for r in rest if isinstance(r, str) for o in r.split(',')):
+            key, _, value = opt.partition('=')
+            options.setdefault(key, value)
+        start = float(options.get('start') or 0.0)
+        if 'pause' in options: self._set_prop('pause', options['pause'] in ('yes', True))
+
+        stall = self._take_fault('stall', path)
+        latency = profile.open_latency + (stall['value'] if stall else 0.0)
+        self.clock.call_later(latency, self._finish_load, token, path, profile, bool(error), start)
+
+    def _finish_load(self, token, path, profile, failed, start=0.0):
+        if token != self._load_token: return
+        if failed:
+            self._fire('end-file', reason='error')
+            self._set_prop('idle-active', True)
+            return
+        self._profile = profile
+        self._set_prop('eof-reached', False)
+        self._set_prop('path', path)
+        self._fire('file-loaded')
+        self._set_prop('duration', profile.duration)
+        tracks = []
+        if profile.has_video: tracks.append({'id': 1, 'type': 'video', 'selected': True})
+        if profile.has_audio: tracks.append({'id': 1, 'type': 'audio', 'selected': True})
+        self._set_prop('track-list', tracks)
+        if profile.has_video: self._fire('video-reconfig')
+        if profile.has_audio: self._fire('audio-reconfig')
+        self._set_prop('time-pos', min(start, profile.duration))
+        self._fire('playback-restart')
+        self._schedule_tick(token)
+
+    def _schedule_tick(self, token):
+        if self._tick_handle: self.clock.cancel(self._tick_handle)
+        self._tick_handle = self.clock.call_later(self.tick, self._on_tick, token)
+
+    def _on_tick(self, token):
+        self._tick_handle = None
+        if token != self._load_token or self._profile is None: return
+        profile = self._profile
+        if not self._props['pause'] and not self._props['eof-reached']:
+            step = self.tick * self._props['speed']
+            if profile.drop_rate > 0:
+                rate = profile.drop_rate * self._render_cost()
+                drops = sum(1 for _ in range(max(1, int(step * profile.fps))) if self._rng.random() < rate)
+                if drops: self._set_prop('frame-drop-count', self._props['frame-drop-count'] + drops)
+            pos = (self._props['time-pos'] or 0.0) + step
+            if pos >= profile.duration:
+                self._set_prop('time-pos', profile.duration)
+                # keep-open=yes: hold the last frame, pause and flag eof instead of ending the file
+                self._set_prop('pause', True)
+                self._set_prop('eof-reached', True)
+            else:
+                self._set_prop('time-pos', pos)
+        self._schedule_tick(token)
+
+    def _render_cost(self):
+        cost = 1.0
+        for prop, factors in _RENDER_COST.items(): cost *= factors.get(self._props.get(prop), 1.0)
+        return cost
+
+    def _cmd_seek(self, amount, reference='relative', *rest):
+        if self._profile is None: raise ValueError("no file loaded")
+        pos = float(amount) + (0.0 if 'absolute' in str(reference) else (self._props['time-pos'] or 0.0))
+        pos = max(0.0, min(pos, self._profile.duration))
+        stall = self._take_fault('seek-stall', self._props['path'])
+        self._fire('seek')
+        token = self._load_token
+        self.clock.call_later(self._profile.seek_latency + (stall['value'] if stall else 0.0),
+                              self._finish_seek, token, pos)
+
+    def _finish_seek(self, token, pos):
+        if token != self._load_token: return
+        self._set_prop('eof-reached', False)
+        self._set_prop('time-pos', pos)
+        self._fire('playback-restart')
+
+    def _cmd_osd_overlay(self, overlay_id, fmt, data='', res_x=0, res_y=0, z=0, *rest):
+        if fmt == 'none': self._osd_overlays.pop(int(overlay_id), None)
+        else: self._osd_overlays[int(overlay_id)] = (fmt, data, int(z))
+
+    def _cmd_screenshot_raw(self, flags='video', *rest):
+        w, h = SIM_WINDOW_SIZE
+        return {'w': w, 'h': h, 'stride': w * 4, 'format': 'bgr0', 'data': bytes(w * h * 4)}
+
+    def _cmd_overlay_add(self, overlay_id, x, y, file, offset, fmt, w, h, stride, *rest):
+        if not 0 <= int(overlay_id) < 64: raise ValueError("overlay id out of range")
+        self._overlays[int(overlay_id)] = (int(w), int(h), fmt)
+
+    def _cmd_overlay_remove(self, overlay_id):
+        self._overlays.pop(int(overlay_id), None)
+
+    def _cmd_stop(self, *args):
+        self._end_file('stop')
+        self._load_token += 1
+
+    def _end_file(self, reason):
+        if self._props['path'] is None: return
+        self._profile = None
+        if self._tick_handle: self.clock.cancel(self._tick_handle)
+        self._tick_handle = None
+        self._fire('end-file', reason=reason)
+        self._set_prop('path', None)
+        self._set_prop('time-pos', None)
+        self._set_prop('duration', None)
+        self._set_prop('track-list', [])
+        self._set_prop('idle-active', True)
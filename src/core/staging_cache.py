@@ -0,0 +1,318 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, pyqtSignal, QStandardPaths
+from src.core.show_bundle import is_bundle_uri
+
+logger = logging.getLogger(__name__)
+
+STATUS_LOCAL = 'local'
+STATUS_QUEUED = 'queued'
+STATUS_STAGING = 'staging'
+STATUS_READY = 'ready'
+STATUS_FAILED = 'failed'
+
+NETWORK_FS = {'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'sshfs', 'fuse.sshfs', 'davfs', 'fuse.davfs2', '9p', 'afpfs', 'webdav'}
+REMOVABLE_ROOTS = ('/media/', '/run/media/', '/mnt/', '/Volumes/')
+
+_CHUNK = 4 * 1024 * 1024
+_FREE_SPACE_MARGIN = 1024 ** 3
+_MOUNTS_TTL = 30.0
+
+_mounts = None  # (read at, [(mount point, fstype)] longest first)
+
+def _mount_table():
+    global _mounts
+    if _mounts is None or time.monotonic() - _mounts[0] > _MOUNTS_TTL:
+        table = []
+        try:
+            with open('/proc/mounts') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 3: table.append((parts[1].replace('\\040', ' '), parts[2]))
+        except OSError: pass
+        table.sort(key=lambda m: len(m[0]), reverse=True)
+        _mounts = (time.monotonic(), table)
+    return _mounts[1]
+
+def _mount_fstype(path):
+    for mount, fstype in _mount_table():
+        if path == mount or path.startswith(mount.rstrip('/') + '/'): return fstype
+    return None
+
+def is_slow_storage(path):
+    """Best-effort check for removable drives and network shares."""
+    if is_bundle_uri(path): return False
+    path = os.path.abspath(path)
+    if sys.platform == 'win32':
+        if path.startswith('\\\\'): return True
+        try:
+            import ctypes
+            # DRIVE_REMOVABLE = 2, DRIVE_REMOTE = 4
+            return ctypes.windll.kernel32.GetDriveTypeW(os.path.splitdrive(path)[0] + '\\') in (2, 4)
+        except Exception: return False
+    if path.startswith(REMOVABLE_ROOTS): return True
+    return _mount_fstype(path) in NETWORK_FS
+
+def _read_uncached(path):
+    """Yields the contents of path read from the disk rather than the OS file cache."""
+    if sys.platform == 'win32':
+        yield from _read_unbuffered_win32(path)
+        return
+    with open(path, 'rb') as f:
+        # Pages of a file that was just fsynced are clean, so this drops them and the reads below miss
+        if hasattr(os, 'posix_fadvise'): os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        while chunk := f.read(_CHUNK): yield chunk
+
+def _read_unbuffered_win32(path):
+    import ctypes
+    from ctypes import wintypes
+    k32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    k32.CreateFileW.restype = wintypes.HANDLE
+    k32.CreateFileW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, ctypes.c_void_p,
+                                wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+    k32.ReadFile.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD, ctypes.POINTER(wintypes.DWORD),
+                             ctypes.c_void_p]
+    # GENERIC_READ, FILE_SHARE_READ, OPEN_EXISTING, FILE_FLAG_NO_BUFFERING | FILE_FLAG_SEQUENTIAL_SCAN
+    handle = k32.CreateFileW(path, 0x80000000, 0x1, None, 3, 0x20000000 | 0x08000000, None)
+    if handle == wintypes.HANDLE(-1).value: raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        # Unbuffered reads need a sector-aligned buffer and length; _CHUNK is a multiple of any sector size
+        storage = ctypes.create_string_buffer(_CHUNK + 4096)
+        buffer = ctypes.addressof(storage) + (-ctypes.addressof(storage) % 4096)
+        read = wintypes.DWORD()
+        while True:
+            if not k32.ReadFile(handle, buffer, _CHUNK, ctypes.byref(read), None):
+                raise ctypes.WinError(ctypes.get_last_error())
+            if not read.value: break
+            yield ctypes.string_at(buffer, read.value)
+    finally:
+        k32.CloseHandle(handle)
+
+def _file_key(path, st):
+    return hashlib.sha1(f"{path}|{st.st_size}|{st.st_mtime_ns}".encode('utf-8')).hexdigest()
+
+class StagingCache(QObject):
+    """Copies upcoming playlist items from slow storage to a local cache directory."""
+    status_changed = pyqtSignal(str, str)
+
+    def __init__(self, playlist_manager, cache_dir=None, budget_bytes=20 * 1024 ** 3, always_stage=False):
+        super().__init__()
+        self.playlist_manager = playlist_manager
+        self.cache_dir = cache_dir or os.path.join(
+            QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation), 'staging')
+        self.budget_bytes = budget_bytes
+        self.always_stage = always_stage
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._entries = OrderedDict()  # source path -> manifest entry, least recently used first
+        self._status = {}
+        self._plan = []
+        self._plan_dirty = True
+        self._needs = {}  # source path -> needs staging; only touched by the worker
+        self._manifest = self._read_manifest()  # entries not yet checked against their source (worker)
+
+        self.playlist_manager.current_item_changed.connect(self._schedule)
+        self.playlist_manager.rowsInserted.connect(self._schedule)
+        self._thread = threading.Thread(target=self._run, name="StagingCache", daemon=True)
+        self._thread.start()
+
+    # --- Public API ---
+
+    def resolve(self, filepath):
+        """Returns the staged copy of filepath if one is ready, otherwise filepath itself."""
+        with self._lock:
+            entry = self._entries.get(filepath)
+            if entry and self._status.get(filepath) == STATUS_READY:
+                self._entries.move_to_end(filepath)
+                entry['last_used'] = time.time()
+                return entry['path']
+        return filepath
+
+    def status(self, filepath):
+        with self._lock:
+            return self._status.get(filepath, STATUS_LOCAL)
+
+    def shutdown(self):
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=2)
+        with self._lock: self._save_manifest()
+
+    # --- Planning ---
+
+    def _needs_staging(self, filepath):
+        needs = self._needs.get(filepath)
+        if needs is None:
+            needs = self._needs[filepath] = not is_bundle_uri(filepath) and os.path.isfile(filepath) and \
+                (self.always_stage or is_slow_storage(filepath))
+        return needs
+
+    def _schedule(self, *_):
+        # GUI thread, on every cut: no file system access here, the worker re-plans
+        self._plan_dirty = True
+        self._wake.set()
+
+    def _replan(self):
+        self._plan_dirty = False
+        items = self.playlist_manager.items()
+        start = max(self.playlist_manager.current_index, 0)
+        plan = [i.filepath for i in items[start:] + items[:start] if self._needs_staging(i.filepath)]
+        changed = []
+        with self._lock:
+            self._plan = plan
+            for path in plan:
+                if self._status.get(path, STATUS_LOCAL) == STATUS_LOCAL:
+                    self._status[path] = STATUS_QUEUED
+                    changed.append(path)
+        for path in changed: self.status_changed.emit(path, STATUS_QUEUED)
+
+    def _next_job(self):
+        with self._lock:
+            for path in self._plan:
+                if self._status.get(path) == STATUS_QUEUED: return path
+        return None
+
+    # --- Worker ---
+
+    def _run(self):
+        self._load_manifest()
+        while not self._stopping:
+            if self._plan_dirty: self._replan()
+            path = self._next_job()
+            if path is None:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            if self._plan_dirty: continue
+            self._set_status(path, STATUS_STAGING)
+            try:
+                self._set_status(path, STATUS_READY if self._stage(path) else STATUS_QUEUED)
+            except Exception as e:
+                if self._stopping: break
+                logger.error(f"Staging failed for {path}: {e}")
+                self._set_status(path, STATUS_FAILED)
+            if self._status.get(path) == STATUS_QUEUED and not self._stopping:
+                # Out of budget: wait for the playlist to move on before trying again
+                self._wake.wait()
+                self._wake.clear()
+
+    def _set_status(self, path, status):
+        with self._lock: self._status[path] = status
+        self.status_changed.emit(path, status)
+
+    def _stage(self, src):
+        st = os.stat(src)
+        key = _file_key(src, st)
+        with self._lock:
+            entry = self._entries.get(src)
+            if entry and entry['key'] == key and os.path.exists(entry['path']):
+                return True
+        if not self._make_room(st.st_size, src): return False
+
+        dst = os.path.join(self.cache_dir, key + os.path.splitext(src)[1].lower())
+        tmp = dst + '.part'
+        started = time.perf_counter()
+        src_hash = hashlib.blake2b()
+        try:
+            with open(src, 'rb') as fin, open(tmp, 'wb') as fout:
+                while chunk := fin.read(_CHUNK):
+                    if self._stopping: raise InterruptedError("shutdown")
+                    src_hash.update(chunk)
+                    fout.write(chunk)
+                fout.flush()
+                os.fsync(fout.fileno())
+            if self._checksum(tmp) != src_hash.hexdigest():
+                raise IOError("checksum mismatch after copy")
+            os.replace(tmp, dst)
+        except BaseException:
+            if os.path.exists(tmp): os.remove(tmp)
+            raise
+
+        with self._lock:
+            old = self._entries.pop(src, None)
+            if old and old['path'] != dst: self._remove_file(old['path'])
+            self._entries[src] = {'key': key, 'path': dst, 'size': st.st_size,
+                                  'checksum': src_hash.hexdigest(), 'last_used': time.time()}
+            self._save_manifest()
+        logger.info(f"Staged {src} ({st.st_size / 1024 ** 2:.1f} MB in {time.perf_counter() - started:.1f}s)")
+        return True
+
+    def _checksum(self, path):
+        # Read back from the disk: hashing the page cache would only re-check the bytes just written
+        h = hashlib.blake2b()
+        for chunk in _read_uncached(path):
+            if self._stopping: raise InterruptedError("shutdown")
+            h.update(chunk)
+        return h.hexdigest()
+
+    def _make_room(self, size, src):
+        """Evicts least recently used copies that are not in the upcoming plan."""
+        with self._lock:
+            protected = set(self._plan[:self._plan.index(src) + 1]) if src in self._plan else {src}
+            used = sum(e['size'] for e in self._entries.values())
+            evicted = []
+            for path in list(self._entries):
+                if used + size <= self.budget_bytes: break
+                if path in protected: continue
+                entry = self._entries.pop(path)
+                self._remove_file(entry['path'])
+                used -= entry['size']
+                evicted.append(path)
+            fits = used + size <= self.budget_bytes
+        try: fits = fits and shutil.disk_usage(self.cache_dir).free - size > _FREE_SPACE_MARGIN
+        except OSError: pass
+        for path in evicted:
+            logger.info(f"Evicted staged copy of {path}")
+            self._set_status(path, STATUS_QUEUED if path in self._plan else STATUS_LOCAL)
+        if not fits: logger.warning(f"Staging budget exhausted, deferring {src}")
+        return fits
+
+    def _remove_file(self, path):
+        try: os.remove(path)
+        except OSError: pass
+
+    # --- Manifest ---
+
+    def _manifest_path(self):
+        return os.path.join(self.cache_dir, 'manifest.json')
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path(), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load_manifest(self):
+        """Keeps the copies whose source is unchanged. Worker thread: sources may be on an offline share."""
+        ready = []
+        for src, entry in sorted(self._manifest.items(), key=lambda kv: kv[1].get('last_used', 0)):
+            if self._stopping: return
+            try: valid = os.path.exists(entry['path']) and _file_key(src, os.stat(src)) == entry['key']
+            except OSError: valid = False
+            with self._lock:
+                del self._manifest[src]
+                if valid:
+                    self._entries[src] = entry
+                    self._status.setdefault(src, STATUS_READY)
+            if valid: ready.append(src)
+            else: self._remove_file(entry.get('path', ''))
+        for src in ready: self.status_changed.emit(src, STATUS_READY)
+
+    def _save_manifest(self):
+        try:
+            with open(self._manifest_path(), 'w', encoding='utf-8') as f:
+                # Entries still waiting for the startup check are kept as they were
+                json.dump({**self._manifest, **self._entries}, f)
+        except OSError as e:
+            logger.warning(f"Could not save staging manifest: {e}")
@@ -0,0 +1,80 @@
+import ctypes
+import logging
+import threading
+from PyQt6 import sip
+from PyQt6.QtGui import QImage
+from src.core.media_controller import mpv, MPV_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+# include/mpv/render.h; python-mpv's MpvRenderParam has no names for the SW_* parameters
+MPV_RENDER_API_TYPE_SW = 'sw'
+MPV_RENDER_PARAM_SW_SIZE = 17
+MPV_RENDER_PARAM_SW_FORMAT = 18
+MPV_RENDER_PARAM_SW_STRIDE = 19
+MPV_RENDER_PARAM_SW_POINTER = 20
+_ALIGN = 64  # render.h asks for 64-byte aligned pointer and stride
+
+class _RenderParam(ctypes.Structure):
+    # Same layout as mpv_render_param
+    _fields_ = [('type_id', ctypes.c_int), ('data', ctypes.c_void_p)]
+
+def software_player(**options):
+    """An mpv player whose video goes to the render API instead of a window."""
+    if not MPV_AVAILABLE: raise RuntimeError("libmpv is not available")
+    options.setdefault('keep_open', 'yes')
+    return mpv.MPV(vo='libmpv', **options)
+
+class SoftwareRenderer:
+    """Renders a player's output (video, OSD and overlays) into a CPU buffer via MPV_RENDER_API_TYPE_SW.
+
+    Needs a player created with vo=libmpv (see software_player). The buffer is rgb0, which is
+    wrapped as a QImage Format_RGBX8888 without copying: an image returned by render() is only
+    valid until the next render() or resize(); copy() it to keep it.
+    """
+    def __init__(self, player, width=1280, height=720):
+        self.player = player
+        self._ctx = mpv.MpvRenderContext(player, MPV_RENDER_API_TYPE_SW)
+        self._frame_pending = threading.Event()
+        # Called on an mpv thread; rendering itself happens on the caller's thread
+        self._ctx.update_cb = self._frame_pending.set
+        self._format = ctypes.c_char_p(b'rgb0')
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        self.width, self.height = width, height
+        self.stride = (width * 4 + _ALIGN - 1) // _ALIGN * _ALIGN
+        self._storage = (ctypes.c_char * (self.stride * height + _ALIGN))()
+        base = ctypes.addressof(self._storage)
+        self._pointer = base + (-base % _ALIGN)
+        self._size = (ctypes.c_int * 2)(width, height)
+        self._stride_value = ctypes.c_size_t(self.stride)
+        self._params = (_RenderParam * 5)(
+            (MPV_RENDER_PARAM_SW_SIZE, ctypes.cast(self._size, ctypes.c_void_p)),
+            (MPV_RENDER_PARAM_SW_FORMAT, ctypes.cast(self._format, ctypes.c_void_p)),
+            (MPV_RENDER_PARAM_SW_STRIDE, ctypes.cast(ctypes.pointer(self._stride_value), ctypes.c_void_p)),
+            (MPV_RENDER_PARAM_SW_POINTER, self._pointer),
+            (0, None))
+        self._image = QImage(sip.voidptr(self._pointer), width, height, self.stride, QImage.Format.Format_RGBX8888)
+        self._frame_pending.set()
+
+    def wait_frame(self, timeout=None):
+        """Blocks until mpv reports something new to render; returns False on timeout."""
+        return self._frame_pending.wait(timeout)
+
+    def render(self, force=False):
+        """Renders the current frame if mpv has a new one (or force=True) and returns the image, else None."""
+        self._frame_pending.clear()
+        if not self._ctx.update() and not force: return None
+        mpv._mpv_render_context_render(self._ctx.handle, ctypes.cast(self._params, ctypes.POINTER(mpv.MpvRenderParam)))
+        return self._image
+
+    def grab(self):
+        """A copy of the current output, for preview grabs on machines without a GPU."""
+        return self.render(force=True).copy()
+
+    def free(self):
+        # Must happen before the player is terminated (render.h)
+        if self._ctx:
+            self._ctx.free()
+            self._ctx = None
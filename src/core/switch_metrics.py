@@ -0,0 +1,60 @@
+import time
+import bisect
+import threading
+from collections import deque
+
+class LatencyHistogram:
+    """Bucketed latency counts plus a window of raw samples for percentiles."""
+    BOUNDS_MS = (10, 20, 35, 50, 75, 100, 150, 200, 300, 500, 750, 1000, 2000, 5000)
+
+    def __init__(self, max_samples=2000):
+        self._samples = deque(maxlen=max_samples)
+        self._counts = [0] * (len(self.BOUNDS_MS) + 1)
+
+    def add(self, ms):
+        self._samples.append(ms)
+        self._counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+
+    def percentile(self, p):
+        if not self._samples: return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+    def buckets(self):
+        labels = [f"<={b}ms" for b in self.BOUNDS_MS] + [f">{self.BOUNDS_MS[-1]}ms"]
+        return list(zip(labels, self._counts))
+
+    def summary(self):
+        return {'count': len(self._samples), 'p50': self.percentile(50), 'p95': self.percentile(95),
+                'p99': self.percentile(99), 'max': max(self._samples) if self._samples else None}
+
+class SwitchMetrics:
+    """Times each cut from the load command to mpv's file-loaded and playback-restart events."""
+    STAGES = ('file_loaded', 'first_frame')
+
+    def __init__(self, time_source=time.perf_counter):
+        self.time_source = time_source
+        self._lock = threading.Lock()
+        self._pending = None
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+
+    def begin(self, filepath):
+        with self._lock:
+            self._pending = {'filepath': filepath, 'start': self.time_source()}
+
+    def mark(self, stage):
+        """Records stage for the pending cut. Returns the finished cut once its first frame is up."""
+        now = self.time_source()
+        with self._lock:
+            cut = self._pending
+            if cut is None or f"{stage}_ms" in cut: return None
+            ms = (now - cut['start']) * 1000.0
+            cut[f"{stage}_ms"] = ms
+            self.histograms[stage].add(ms)
+            if stage != 'first_frame': return None
+            self._pending = None
+            return cut
+
+    def summary(self):
+        with self._lock:
+            return {stage: h.summary() for stage, h in self.histograms.items()}
@@ -4,10 +4,17 @@ import os
 import ctypes
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QIcon
-from src.core.media_controller import MediaController
+from src.core.media_controller import MediaController, MPV_AVAILABLE
+from src.core.sw_renderer import software_player
 from src.core.playlist_manager import PlaylistManager
 from src.core.screen_manager import ScreenManager
+from src.core.staging_cache import StagingCache
+from src.core.prefetcher import Prefetcher
+from src.core.loudness_analyzer import LoudnessAnalyzer
+from src.core.media_library import MediaLibrary
+from src.core.quality_governor import QualityGovernor
 from src.ui.main_window import MainWindow
+from src.utils.tracer import tracer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -16,6 +23,12 @@ def main():
     app = QApplication(sys.argv)
     app.setApplicationName("ProVideoiPhoto")
     
+    # PROVIDEO_TRACE=<file.json> records a trace for the whole session
+    trace_path = os.environ.get('PROVIDEO_TRACE')
+    if trace_path:
+        tracer.start()
+        app.aboutToQuit.connect(lambda: tracer.export(trace_path))
+    
     # Taskbar Icon Fix for Windows
     try:
         ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('mycompany.provideoiphoto.player.1.0')
@@ -40,11 +53,30 @@ def main():
         app.setWindowIcon(QIcon(icon_path))
     
     # Initialize Core & UI
-    media_controller = MediaController()
+    # PROVIDEO_SOFTWARE_RENDER=1 renders on the CPU for machines without a GPU: the control panel
+    # preview (and the presentation window) show frames grabbed from the software renderer
+    software_render = MPV_AVAILABLE and os.environ.get('PROVIDEO_SOFTWARE_RENDER') == '1'
+    media_controller = MediaController(player_factory=software_player if software_render else None)
+    if software_render:
+        media_controller.enable_software_output()
+        app.aboutToQuit.connect(media_controller.disable_software_output)
     playlist_manager = PlaylistManager()
     screen_manager = ScreenManager()
+    staging_cache = StagingCache(playlist_manager)
+    media_controller.set_staging_cache(staging_cache)
+    app.aboutToQuit.connect(staging_cache.shutdown)
+    prefetcher = Prefetcher(playlist_manager, resolve=staging_cache.resolve)
+    app.aboutToQuit.connect(prefetcher.shutdown)
+    loudness_analyzer = LoudnessAnalyzer(playlist_manager)
+    media_controller.set_loudness_analyzer(loudness_analyzer)
+    app.aboutToQuit.connect(loudness_analyzer.shutdown)
+    
+    media_library = MediaLibrary()
+    quality_governor = QualityGovernor(media_controller)
     
-    main_window = MainWindow(media_controller, playlist_manager, screen_manager)
+    main_window = MainWindow(media_controller, playlist_manager, screen_manager,
+                             staging_cache=staging_cache, media_library=media_library,
+                             quality_governor=quality_governor, prefetcher=prefetcher)
     main_window.show()
     
     sys.exit(app.exec())
@@ -14,8 +14,10 @@ class HotkeysDialog(QDialog):
         self.display_names = {
             "play_pause": "Play / Pause", "stop": "Stop", "prev_track": "Prev Track",
             "next_track": "Next Track", "black_screen": "Toggle Black Screen",
+            "freeze": "Toggle Freeze Frame", "fade": "Fade To / From Black",
             "toggle_presentation": "Toggle Presentation", "add_files": "Add Files",
-            "toggle_timer": "Toggle Timer", "reset_timer": "Reset Timer", "help": "Help"
+            "toggle_timer": "Toggle Timer", "reset_timer": "Reset Timer", "help": "Help",
+            "toggle_trace": "Start / Save Trace"
         }
         self._init_ui()
 
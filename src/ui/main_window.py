@@ -1,13 +1,18 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                                QPushButton, QLabel, QSplitter, QFrame, QFileDialog, 
-                               QListWidget, QListWidgetItem, QComboBox, QSlider, QMessageBox)
+                               QListWidget, QListWidgetItem, QComboBox, QSlider, QMessageBox, QLineEdit)
 from PyQt6.QtCore import Qt, QTimer, QTime, QSettings
-from PyQt6.QtGui import QIcon, QShortcut, QKeySequence
+from PyQt6.QtGui import QIcon, QShortcut, QKeySequence, QColor, QPixmap
 import os
+import time
 
 from src.ui.presentation_window import PresentationWindow
-from src.utils.thumbnail_generator import ThumbnailGenerator
+from src.utils.thumbnail_generator import ThumbnailGenerator, ThumbnailLoader
 from src.ui.hotkeys_dialog import HotkeysDialog
+from src.core.show_bundle import BUNDLE_EXT, is_bundle_file, write_bundle
+from src.utils.tracer import tracer
+from src.core.command_queue import CommandQueue
+from src.core.staging_cache import STATUS_LOCAL, STATUS_QUEUED, STATUS_STAGING, STATUS_READY, STATUS_FAILED
 
 class ClickableSlider(QSlider):
     """Slider that jumps to click position."""
@@ -23,12 +28,24 @@ class ClickableSlider(QSlider):
         super().mouseReleaseEvent(event)
         self.sliderReleased.emit()
 
+STAGING_LABELS = {
+    STATUS_QUEUED: ("queued", "#b08000"), STATUS_STAGING: ("staging...", "#b08000"),
+    STATUS_READY: ("ready", "#2e8b57"), STATUS_FAILED: ("staging failed", "#c0392b")
+}
+
 class MainWindow(QMainWindow):
-    def __init__(self, media_controller, playlist_manager, screen_manager):
+    def __init__(self, media_controller, playlist_manager, screen_manager, staging_cache=None, media_library=None,
+                 quality_governor=None, command_queue=None, prefetcher=None):
         super().__init__()
         self.media_controller = media_controller
         self.playlist_manager = playlist_manager
         self.screen_manager = screen_manager
+        self.staging_cache = staging_cache
+        self.media_library = media_library
+        self.quality_governor = quality_governor
+        self.prefetcher = prefetcher
+        # All operator input to the player and playlist goes through this queue
+        self.command_queue = command_queue or CommandQueue(playlist_manager)
         self.presentation_window = None
         
         # Configuration
@@ -43,6 +60,8 @@ class MainWindow(QMainWindow):
         self.is_timer_running = False
         self.is_seeking = False
         self.duration = 0
+        self._current_item = None
+        self.thumbnail_loader = ThumbnailLoader()
         
         # UI Setup
         self.setWindowTitle("ProVideoiPhoto - Control Panel")
@@ -53,8 +72,14 @@ class MainWindow(QMainWindow):
         self._connect_signals()
         self._apply_hotkeys()
         
+        # Without a GPU the player renders into memory and the preview shows its frames
+        if self.media_controller.renderer:
+            self._frame_timer = QTimer(self)
+            self._frame_timer.timeout.connect(self._show_software_frame)
+            self._frame_timer.start(40)
+
         # Mock Warning
-        if self.media_controller.is_mock:
+        if self.media_controller.engine_fallback:
             QTimer.singleShot(500, self._show_mock_warning)
 
     def _set_app_icon(self):
@@ -72,11 +97,13 @@ class MainWindow(QMainWindow):
     def _init_hotkeys_data(self):
         self.default_hotkeys = {
             "play_pause": "Space", "stop": "Esc", "prev_track": "Left", "next_track": "Right",
-            "black_screen": "B", "toggle_presentation": "F5", "add_files": "Ctrl+O",
-            "toggle_timer": "T", "reset_timer": "R", "help": "F1"
+            "black_screen": "B", "freeze": "F", "fade": "Shift+B", "toggle_presentation": "F5", "add_files": "Ctrl+O",
+            "toggle_timer": "T", "reset_timer": "R", "help": "F1", "toggle_trace": "Ctrl+Shift+T"
         }
         self.current_hotkeys = self.settings.value("hotkeys", self.default_hotkeys)
         if not isinstance(self.current_hotkeys, dict): self.current_hotkeys = self.default_hotkeys
+        # Actions added after the hotkeys were saved still get their default binding
+        self.current_hotkeys = {**self.default_hotkeys, **self.current_hotkeys}
 
     def _apply_hotkeys(self):
         for s in self.shortcuts.values(): s.setEnabled(False)
@@ -85,14 +112,16 @@ class MainWindow(QMainWindow):
         actions_map = {
             "play_pause": self._toggle_play, "stop": self._stop_playback,
             "prev_track": self._prev_track, "next_track": self._next_track,
-            "black_screen": self._toggle_black_screen, "toggle_presentation": self._toggle_presentation_screen,
+            "black_screen": self._toggle_black_screen, "freeze": self._toggle_freeze, "fade": self._toggle_fade,
+            "toggle_presentation": self._toggle_presentation_screen,
             "add_files": self._add_files, "toggle_timer": self._toggle_timer,
-            "reset_timer": self._reset_timer, "help": self._show_help
+            "reset_timer": self._reset_timer, "help": self._show_help, "toggle_trace": self._toggle_trace
         }
         
         for name, seq in self.current_hotkeys.items():
             if name in actions_map and seq:
                 shortcut = QShortcut(QKeySequence(seq), self)
+                shortcut.activated.connect(lambda n=name: tracer.instant(f"hotkey {n}", 'input'))
                 shortcut.activated.connect(actions_map[name])
                 self.shortcuts[name] = shortcut
                 self._update_tooltip(name, seq)
@@ -100,12 +129,24 @@ class MainWindow(QMainWindow):
     def _update_tooltip(self, name, seq):
         widgets = {
             "play_pause": self.play_btn, "stop": self.stop_btn, "prev_track": self.prev_btn,
-            "next_track": self.next_btn, "black_screen": self.black_btn, 
+            "next_track": self.next_btn, "black_screen": self.black_btn, "freeze": self.freeze_btn, "fade": self.fade_btn,
             "toggle_presentation": self.screen_selector_btn, "add_files": self.add_file_btn,
             "toggle_timer": self.timer_btn, "reset_timer": self.reset_timer_btn, "help": self.help_btn
         }
         if name in widgets: widgets[name].setToolTip(f"Shortcut: {seq}")
 
+    def _toggle_trace(self):
+        if not tracer.enabled:
+            tracer.start()
+            self.statusBar().showMessage("Trace recording started")
+            return
+        tracer.stop()
+        path, _ = QFileDialog.getSaveFileName(self, "Save Trace", "trace.json", "Chrome Trace (*.json)")
+        if not path: return
+        try: tracer.export(path)
+        except OSError as e: QMessageBox.warning(self, "Trace", f"Could not save trace:\n{e}")
+        else: self.statusBar().showMessage(f"Trace saved to {path} (open in ui.perfetto.dev or chrome://tracing)")
+
     def _show_help(self):
         HotkeysDialog(self.current_hotkeys, self, readonly=True).exec()
 
@@ -113,6 +154,19 @@ class MainWindow(QMainWindow):
         central = QWidget()
         self.setCentralWidget(central)
         layout = QVBoxLayout(central)
+        self.queue_status_label = QLabel("")
+        self.queue_status_label.setStyleSheet("color: gray;")
+        self.statusBar().addPermanentWidget(self.queue_status_label)
+        self.prefetch_status_label = QLabel("")
+        self.prefetch_status_label.setStyleSheet("color: gray;")
+        self.statusBar().addPermanentWidget(self.prefetch_status_label)
+        loudness = self.media_controller.loudness_analyzer
+        if loudness and not loudness.available:
+            self.loudness_status_label = QLabel("Loudness off")
+            self.loudness_status_label.setStyleSheet("color: orange;")
+            self.loudness_status_label.setToolTip("ffmpeg not found: files play without loudness levelling.\n"
+                                                  "Put ffmpeg next to the app, on PATH, or pip install imageio-ffmpeg.")
+            self.statusBar().addPermanentWidget(self.loudness_status_label)
         
         # Top Bar
         top = QHBoxLayout()
@@ -154,12 +208,18 @@ class MainWindow(QMainWindow):
         # Left: Playlist
         playlist_widget = QWidget()
         plist_layout = QVBoxLayout(playlist_widget)
+        if self.media_library is not None: self._init_library_ui(plist_layout)
         plist_layout.addWidget(QLabel("Playlist"))
         
         self.add_file_btn = QPushButton("Add Files")
         self.add_file_btn.clicked.connect(self._add_files)
         plist_layout.addWidget(self.add_file_btn)
         
+        self.pack_show_btn = QPushButton("Pack Show")
+        self.pack_show_btn.setToolTip("Save the playlist as a single show bundle file")
+        self.pack_show_btn.clicked.connect(self._pack_show)
+        plist_layout.addWidget(self.pack_show_btn)
+        
         self.playlist_view = QListWidget()
         self.playlist_view.itemDoubleClicked.connect(self._on_playlist_item_dbl_click)
         plist_layout.addWidget(self.playlist_view)
@@ -219,6 +279,8 @@ class MainWindow(QMainWindow):
         self.stop_btn = QPushButton("Stop")
         self.next_btn = QPushButton("Next")
         self.black_btn = QPushButton("Black Screen")
+        self.freeze_btn = QPushButton("Freeze")
+        self.fade_btn = QPushButton("Fade")
         
         for b in [self.prev_btn, self.play_btn, self.stop_btn, self.next_btn]:
             ctrl_layout.addWidget(b)
@@ -233,6 +295,8 @@ class MainWindow(QMainWindow):
         ctrl_layout.addWidget(self.volume_slider)
         
         ctrl_layout.addStretch()
+        ctrl_layout.addWidget(self.freeze_btn)
+        ctrl_layout.addWidget(self.fade_btn)
         ctrl_layout.addWidget(self.black_btn)
         right_layout.addLayout(ctrl_layout)
         
@@ -242,24 +306,108 @@ class MainWindow(QMainWindow):
         self.prev_btn.clicked.connect(self._prev_track)
         self.next_btn.clicked.connect(self._next_track)
         self.black_btn.clicked.connect(self._toggle_black_screen)
+        self.freeze_btn.clicked.connect(self._toggle_freeze)
+        self.fade_btn.clicked.connect(self._toggle_fade)
         
         self.main_splitter.setSizes([360, 840])
 
+    def _init_library_ui(self, layout):
+        header = QHBoxLayout()
+        header.addWidget(QLabel("Library"))
+        header.addStretch()
+        self.library_status_label = QLabel("")
+        self.library_status_label.setStyleSheet("color: gray;")
+        header.addWidget(self.library_status_label)
+        layout.addLayout(header)
+        
+        search_row = QHBoxLayout()
+        self.library_search = QLineEdit()
+        self.library_search.setPlaceholderText("Search: name prefix, typo-tolerant, tag:4k or #folder")
+        self.library_search.setClearButtonEnabled(True)
+        self.library_search.textChanged.connect(self._on_library_search)
+        search_row.addWidget(self.library_search)
+        self.watch_folder_btn = QPushButton("Watch Folder")
+        self.watch_folder_btn.clicked.connect(self._add_library_folder)
+        search_row.addWidget(self.watch_folder_btn)
+        layout.addLayout(search_row)
+        
+        self.library_results = QListWidget()
+        self.library_results.setMaximumHeight(180)
+        self.library_results.setToolTip("Double-click to add to the playlist")
+        self.library_results.itemDoubleClicked.connect(
+            lambda item: self._process_added_files([item.data(Qt.ItemDataRole.UserRole)]))
+        layout.addWidget(self.library_results)
+        
+        for folder in self.settings.value("library/folders", [], type=list) or []:
+            self.media_library.add_folder(folder)
+
+    def _add_library_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Watch Folder")
+        if not folder: return
+        self.media_library.add_folder(folder)
+        self.settings.setValue("library/folders", self.media_library.watched_folders())
+
+    def _on_library_search(self, *_):
+        query = self.library_search.text().strip()
+        started = time.perf_counter()
+        results = self.media_library.search(query) if query else []
+        elapsed = (time.perf_counter() - started) * 1000
+        
+        self.library_results.clear()
+        for entry in results:
+            item = QListWidgetItem(entry.name)
+            item.setData(Qt.ItemDataRole.UserRole, entry.path)
+            item.setToolTip(f"{entry.path}\nTags: {', '.join(sorted(entry.tags))}")
+            self.library_results.addItem(item)
+        status = f"{len(self.media_library)} files"
+        if query: status = f"{len(results)} of {len(self.media_library)} in {elapsed:.1f} ms"
+        self.library_status_label.setText(status)
+
     def _connect_signals(self):
         self.playlist_manager.current_item_changed.connect(self._on_track_changed)
         self.media_controller.playback_status_changed.connect(self._on_playback_status_changed)
         self.media_controller.position_changed.connect(self._on_position_changed)
         self.media_controller.duration_changed.connect(self._on_duration_changed)
+        self.media_controller.switch_measured.connect(self._on_switch_measured)
+        self.media_controller.blackout_changed.connect(self._on_blackout_changed)
+        self.media_controller.freeze_changed.connect(self._on_freeze_changed)
+        self.media_controller.retargeted.connect(self._on_retargeted)
+        self.screen_manager.screens_changed.connect(self._update_screen_combo)
+        self.screen_manager.presentation_screen_changed.connect(self._on_presentation_screen_changed)
+        self.thumbnail_loader.image_ready.connect(self._on_preview_ready)
+        if self.staging_cache: self.staging_cache.status_changed.connect(self._on_staging_status_changed)
+        if self.media_library is not None: self.media_library.index_changed.connect(self._on_library_search)
+        if self.quality_governor: self.quality_governor.quality_changed.connect(self._on_quality_changed)
+        self.command_queue.stats_changed.connect(self._on_queue_stats_changed)
+        if self.prefetcher: self.prefetcher.latency_saved.connect(self._on_prefetch_saved)
 
     def _update_screen_combo(self):
+        self.screen_combo.blockSignals(True)
         self.screen_combo.clear()
         screens = self.screen_manager.get_available_screens()
         for i, s in enumerate(screens):
             self.screen_combo.addItem(f"{i}: {s.name()}", i)
         
-        idx = 1 if len(screens) > 1 else 0
+        idx = self.screen_manager.get_presentation_screen_index()
+        if idx < 0:
+            idx = 1 if len(screens) > 1 else 0
+            self.screen_manager.set_presentation_screen(idx)
         self.screen_combo.setCurrentIndex(idx)
-        self.screen_manager.set_presentation_screen(idx)
+        self.screen_combo.blockSignals(False)
+
+    def _on_presentation_screen_changed(self, screen):
+        self._update_screen_combo()
+        if not self.presentation_window or screen is None: return
+        # Same window and native video surface on another screen: playback is not interrupted
+        handle = self.presentation_window.windowHandle()
+        if handle: handle.setScreen(screen)
+        self.presentation_window.setGeometry(screen.geometry())
+        self.presentation_window.showFullScreen()
+        self.statusBar().showMessage(f"Presentation moved to {screen.name()}", 5000)
+
+    def _on_retargeted(self, ms):
+        p95 = self.media_controller.retarget_latency.percentile(95)
+        self.statusBar().showMessage(f"Output moved in {ms:.0f} ms (p95 {p95:.0f} ms)", 5000)
 
     def _on_screen_selection_changed(self, index):
         if index >= 0: self.screen_manager.set_presentation_screen(self.screen_combo.itemData(index))
@@ -284,60 +432,134 @@ class MainWindow(QMainWindow):
         self.elapsed_time = self.elapsed_time.addSecs(1)
         self.timer_label.setText(self.elapsed_time.toString("HH:mm:ss"))
 
+    @tracer.traced(cat='ui')
     def _toggle_black_screen(self):
-        if self.presentation_window:
-            is_black = self.black_btn.text() == "Black Screen"
-            self.presentation_window.set_black_screen(is_black)
-            self.black_btn.setText("Show Content" if is_black else "Black Screen")
-            self.black_btn.setStyleSheet("background-color: red; color: white;" if is_black else "")
+        self.command_queue.critical('black', self.media_controller.set_black, not self.media_controller.is_black)
+
+    @tracer.traced(cat='ui')
+    def _toggle_fade(self):
+        self.command_queue.critical('fade', self.media_controller.fade, not self.media_controller.is_black,
+                                    self.settings.value("fade_seconds", 1.0, type=float))
+
+    @tracer.traced(cat='ui')
+    def _toggle_freeze(self):
+        frozen = not self.media_controller.is_frozen
+        self.command_queue.critical('freeze', self.media_controller.freeze, frozen)
+
+    def _on_freeze_changed(self, frozen):
+        self.freeze_btn.setText("Unfreeze" if frozen else "Freeze")
+        self.freeze_btn.setStyleSheet("background-color: #2a6fdb; color: white;" if frozen else "")
+
+    def _on_blackout_changed(self, is_black):
+        if self.presentation_window: self.presentation_window.set_black_screen(is_black)
+        self.black_btn.setText("Show Content" if is_black else "Black Screen")
+        self.black_btn.setStyleSheet("background-color: red; color: white;" if is_black else "")
 
     def _add_files(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Select Media", "", "Media (*.mp4 *.mov *.mkv *.jpg *.png);;All (*)")
+        files, _ = QFileDialog.getOpenFileNames(self, "Select Media", "", f"Media (*.mp4 *.mov *.mkv *.jpg *.png *{BUNDLE_EXT});;All (*)")
         if files: self._process_added_files(files)
 
     def _process_added_files(self, files):
         for f in files:
             if not os.path.exists(f): continue
-            self.playlist_manager.add_file(f)
-            item = QListWidgetItem(os.path.basename(f))
-            item.setData(Qt.ItemDataRole.UserRole, f)
-            thumb = ThumbnailGenerator.generate(f, size=(64, 64))
-            if not thumb.isNull(): item.setIcon(QIcon(thumb))
-            self.playlist_view.addItem(item)
+            if is_bundle_file(f):
+                try: bundle_items = self.playlist_manager.add_bundle(f)
+                except (OSError, ValueError) as e:
+                    QMessageBox.warning(self, "Show Bundle", f"Could not open show bundle:\n{e}")
+                    continue
+                for b in bundle_items: self._add_playlist_entry(b.filepath, b.filename)
+            else:
+                self.playlist_manager.add_file(f)
+                self._add_playlist_entry(f, os.path.basename(f))
+
+    def _add_playlist_entry(self, filepath, filename):
+        item = QListWidgetItem(filename)
+        item.setData(Qt.ItemDataRole.UserRole, filepath)
+        item.setData(Qt.ItemDataRole.UserRole + 1, filename)
+        thumb = ThumbnailGenerator.generate(filepath, size=(64, 64))
+        if not thumb.isNull(): item.setIcon(QIcon(thumb))
+        self.playlist_view.addItem(item)
+        if self.staging_cache: self._show_staging_status(item, self.staging_cache.status(filepath))
+
+    def _on_staging_status_changed(self, filepath, status):
+        for row in range(self.playlist_view.count()):
+            item = self.playlist_view.item(row)
+            if item.data(Qt.ItemDataRole.UserRole) == filepath: self._show_staging_status(item, status)
+
+    def _show_staging_status(self, item, status):
+        filename = item.data(Qt.ItemDataRole.UserRole + 1)
+        if status == STATUS_LOCAL:
+            item.setText(filename)
+            item.setToolTip("")
+            item.setData(Qt.ItemDataRole.ForegroundRole, None)
+            return
+        label, color = STAGING_LABELS[status]
+        item.setText(f"{filename}  [{label}]")
+        item.setToolTip(f"Local copy: {label}")
+        item.setForeground(QColor(color))
+
+    def _pack_show(self):
+        files = [i.filepath for i in self.playlist_manager.items() if os.path.exists(i.filepath)]
+        if not files:
+            QMessageBox.information(self, "Pack Show", "Add local media files to the playlist first.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save Show Bundle", "", f"Show Bundle (*{BUNDLE_EXT})")
+        if not path: return
+        if not is_bundle_file(path): path += BUNDLE_EXT
+        try: write_bundle(path, files)
+        except OSError as e:
+            QMessageBox.warning(self, "Pack Show", f"Could not write show bundle:\n{e}")
 
     def dragEnterEvent(self, e):
         if e.mimeData().hasUrls(): e.acceptProposedAction()
 
     def dropEvent(self, e):
-        files = [u.toLocalFile() for u in e.mimeData().urls() if u.toLocalFile().lower().endswith(('.mp4','.mov','.mkv','.jpg','.png','.avi'))]
+        files = [u.toLocalFile() for u in e.mimeData().urls() if u.toLocalFile().lower().endswith(('.mp4','.mov','.mkv','.jpg','.png','.avi',BUNDLE_EXT))]
         if files:
             self._process_added_files(files)
             e.acceptProposedAction()
 
     def _on_playlist_item_dbl_click(self, item):
-        self.playlist_manager.set_current_index(self.playlist_view.row(item))
+        self.command_queue.navigate(index=self.playlist_view.row(item))
 
+    @tracer.traced(cat='ui')
     def _toggle_presentation_screen(self):
         if not self.presentation_window:
             self.presentation_window = PresentationWindow()
+            self.presentation_window.set_black_screen(self.media_controller.is_black)
             screen = self.screen_manager.get_presentation_screen_geometry()
             if screen: self.presentation_window.setGeometry(screen)
             self.presentation_window.showFullScreen()
-            self.media_controller.set_window_id(self.presentation_window.get_video_container_id())
+            self.media_controller.retarget(self.presentation_window.get_video_container_id())
             self.screen_selector_btn.setText("Stop Presentation")
         else:
+            # Output continues in the preview frame before the presentation surface goes away
+            self.media_controller.retarget(None if self.media_controller.is_mock else int(self.current_preview_frame.winId()))
             self.presentation_window.close()
             self.presentation_window = None
             self.screen_selector_btn.setText("Start Presentation")
-            self.media_controller.set_window_id(None)
 
-    def _stop_playback(self): self.media_controller.stop()
-    def _prev_track(self): self.playlist_manager.previous()
-    def _next_track(self): self.playlist_manager.next()
-    def _toggle_play(self): self.media_controller.toggle_pause()
+    @tracer.traced(cat='ui')
+    def _stop_playback(self): self.command_queue.critical('stop', self.media_controller.stop)
+    @tracer.traced(cat='ui')
+    def _prev_track(self): self.command_queue.navigate(-1)
+    @tracer.traced(cat='ui')
+    def _next_track(self): self.command_queue.navigate(+1)
+    @tracer.traced(cat='ui')
+    def _toggle_play(self): self.command_queue.submit('play_pause', self.media_controller.toggle_pause)
 
+    @tracer.traced(cat='ui')
     def _on_track_changed(self, item):
         if not item: return
+        self._current_item = item
+        
+        # Player first: nothing below may delay the cut
+        if not self.media_controller.is_mock:
+            if self.presentation_window:
+                self.media_controller.set_window_id(self.presentation_window.get_video_container_id())
+            else:
+                self.media_controller.set_window_id(int(self.current_preview_frame.winId()))
+        self.media_controller.load_file(item.filepath)
         
         # Reset Seek
         self.duration = 0
@@ -345,32 +567,55 @@ class MainWindow(QMainWindow):
         self.seek_slider.setValue(0)
         self.time_current_label.setText("00:00")
         self.time_total_label.setText("00:00")
+        self.setWindowTitle(f"ProVideoiPhoto - Playing: {item.filename}")
         
-        # Preview
-        thumb = ThumbnailGenerator.generate(item.filepath, size=(800, 450))
+        # Preview is decoded off-thread and applied in _on_preview_ready
+        self.preview_label.setText(f"Playing:\n{item.filename}")
+        if self.presentation_window and not self.media_controller.is_mock:
+            self.presentation_window.clear_content()
+        self.thumbnail_loader.request(item.filepath, (800, 450))
+
+    @tracer.traced(cat='ui')
+    def _on_preview_ready(self, filepath, image):
+        item = self._current_item
+        if not item or item.filepath != filepath: return
+        thumb = QPixmap.fromImage(image) if not image.isNull() else ThumbnailGenerator.generate(filepath, size=(800, 450))
         if not thumb.isNull():
             self.preview_label.setPixmap(thumb.scaled(self.current_preview_frame.size(), Qt.AspectRatioMode.KeepAspectRatio))
-        else:
-            self.preview_label.setText(f"Playing:\n{item.filename}")
-
-        # Presentation Window
-        if self.presentation_window:
-            if self.media_controller.is_mock:
-                if not thumb.isNull(): self.presentation_window.show_image(thumb)
-                else: self.presentation_window.show_message(f"Playing:\n{item.filename}")
-            else:
-                self.presentation_window.clear_content()
-                self.media_controller.set_window_id(self.presentation_window.get_video_container_id())
-        else:
-            if not self.media_controller.is_mock:
-                self.media_controller.set_window_id(int(self.current_preview_frame.winId()))
         
-        self.media_controller.load_file(item.filepath)
-        self.setWindowTitle(f"ProVideoiPhoto - Playing: {item.filename}")
+        if self.presentation_window and self.media_controller.is_mock:
+            if not thumb.isNull(): self.presentation_window.show_image(thumb)
+            else: self.presentation_window.show_message(f"Playing:\n{item.filename}")
+
+    def _show_software_frame(self):
+        renderer = self.media_controller.renderer
+        if renderer is None or not renderer.wait_frame(0): return
+        frame = QPixmap.fromImage(renderer.grab())
+        self.preview_label.setPixmap(frame.scaled(self.current_preview_frame.size(), Qt.AspectRatioMode.KeepAspectRatio))
+        if self.presentation_window: self.presentation_window.show_image(frame)
+
+    def _on_switch_measured(self, cut):
+        ttff = self.media_controller.switch_metrics.summary()['first_frame']
+        self.statusBar().showMessage(
+            f"Last cut: {cut['first_frame_ms']:.0f} ms to first frame  |  "
+            f"p95 {ttff['p95']:.0f} ms  p99 {ttff['p99']:.0f} ms  ({ttff['count']} cuts)")
+
+    def _on_queue_stats_changed(self, stats):
+        self.queue_status_label.setText(f"Queue {stats['depth']}  |  collapsed {stats['collapsed']}")
+
+    def _on_prefetch_saved(self, filepath, seconds):
+        stats = self.prefetcher.stats()
+        self.prefetch_status_label.setText(f"Prefetch saved up to {seconds * 1000:.0f} ms  |  total {stats['saved_seconds']:.1f} s")
+        self.prefetch_status_label.setToolTip(f"Upper bound: time the warm read took on a cold cache\n"
+                                              f"{stats['warmed_items']} items warm, {stats['pending_jobs']} reads queued")
+
+    def _on_quality_changed(self, level, reason):
+        self.statusBar().showMessage(f"Render quality: {level} ({reason})", 10000)
 
     def _on_playback_status_changed(self, is_playing):
         self.play_btn.setText("Pause" if is_playing else "Play")
 
+    @tracer.traced(cat='ui')
     def _on_position_changed(self, pos):
         if self.duration <= 0:
             dur = self.media_controller.get_duration()
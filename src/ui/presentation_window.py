@@ -30,6 +30,8 @@ class PresentationWindow(QWidget):
         self.content_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.content_label.setStyleSheet("color: white; font-size: 24px;")
         self.content_label.hide()
+        self.has_content = False
+        self.black = False
         
         self.video_container.resizeEvent = lambda e: self.content_label.resize(self.video_container.size())
 
@@ -37,18 +39,24 @@ class PresentationWindow(QWidget):
         return int(self.video_container.winId())
 
     def set_black_screen(self, enabled):
-        self.video_container.setVisible(not enabled)
+        # Video is blanked by the player itself; only Qt-drawn content is hidden here, so the
+        # native video surface stays mapped
+        self.black = enabled
+        self.content_label.setVisible(not enabled and self.has_content)
 
     def show_image(self, pixmap):
         self.content_label.setPixmap(pixmap.scaled(self.video_container.size(), Qt.AspectRatioMode.KeepAspectRatio))
-        self.content_label.show()
+        self.has_content = True
+        self.content_label.setVisible(not self.black)
 
     def show_message(self, text):
         self.content_label.setText(text)
-        self.content_label.show()
+        self.has_content = True
+        self.content_label.setVisible(not self.black)
         
     def clear_content(self):
         self.content_label.clear()
+        self.has_content = False
         self.content_label.hide()
 
     def keyPressEvent(self, event):
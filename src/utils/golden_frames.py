@@ -0,0 +1,159 @@
+"""Golden-frame checks on the software render path: needs libmpv, but no GPU or display.
+
+    QT_QPA_PLATFORM=offscreen python -m src.utils.golden_frames --out frames/ [--golden golden/ [--update]]
+
+Drives a real MediaController whose player renders through SoftwareRenderer and checks what
+actually comes out: cut timing to the first correct frame, black screen, and image scaling
+(full frame for 16:9, pillarbox for 4:3). With --golden every captured frame is also compared
+against a stored reference; --update rewrites the references.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import logging
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtGui import QGuiApplication, QImage, QColor
+from src.core.media_controller import MediaController
+from src.core.sw_renderer import software_player
+
+RED, BLUE, GREEN, BLACK = QColor(220, 30, 30), QColor(30, 30, 220), QColor(30, 200, 30), QColor(0, 0, 0)
+OUTPUT_SIZE = (1280, 720)
+
+def _close(color, expected, tolerance=24):
+    return all(abs(a - b) <= tolerance for a, b in
+               zip((color.red(), color.green(), color.blue()), (expected.red(), expected.green(), expected.blue())))
+
+def _at(image, fx, fy):
+    return image.pixelColor(min(image.width() - 1, int(fx * image.width())), min(image.height() - 1, int(fy * image.height())))
+
+def _grid(image, nx=16, ny=9):
+    return [_at(image, (x + 0.5) / nx, (y + 0.5) / ny) for y in range(ny) for x in range(nx)]
+
+def _make_image(path, width, height, color):
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(color)
+    image.save(path)
+    return path
+
+def _diff(a, b):
+    """Mean per-channel difference over a sample grid, 0-255."""
+    pa, pb = _grid(a, 32, 18), _grid(b, 32, 18)
+    total = sum(abs(x.red() - y.red()) + abs(x.green() - y.green()) + abs(x.blue() - y.blue()) for x, y in zip(pa, pb))
+    return total / (3 * len(pa))
+
+class GoldenRun:
+    def __init__(self, media_dir, timeout=5.0):
+        self.timeout = timeout
+        self.media_controller = MediaController(player_factory=lambda: software_player(image_display_duration='inf'))
+        if self.media_controller.is_mock: raise RuntimeError("libmpv is not available")
+        self.renderer = self.media_controller.enable_software_output(*OUTPUT_SIZE)
+        self.media = {
+            'red': _make_image(os.path.join(media_dir, 'red_16x9.png'), 640, 360, RED),
+            'blue': _make_image(os.path.join(media_dir, 'blue_16x9.png'), 640, 360, BLUE),
+            'green_4x3': _make_image(os.path.join(media_dir, 'green_4x3.png'), 640, 480, GREEN),
+        }
+        self.frames = {}
+        self.results = []
+
+    def close(self):
+        self.media_controller.disable_software_output()
+        self.media_controller.player.terminate()
+
+    def until(self, predicate):
+        """Renders frames until predicate(image) holds; returns (image copy, seconds) or (last image, None)."""
+        started = time.perf_counter()
+        image = None
+        while time.perf_counter() - started < self.timeout:
+            QCoreApplication.processEvents()
+            self.renderer.wait_frame(0.02)
+            frame = self.renderer.render()
+            if frame is None: continue
+            image = frame
+            if predicate(image): return image.copy(), time.perf_counter() - started
+        return (image.copy() if image is not None else None), None
+
+    def check(self, name, ok, detail, frame=None):
+        if frame is not None: self.frames[name] = frame
+        self.results.append((name, bool(ok), detail))
+
+    def run(self, max_cut_ms):
+        mc = self.media_controller
+        centre = lambda color: (lambda img: _close(_at(img, 0.5, 0.5), color))
+
+        mc.load_file(self.media['red'])
+        frame, elapsed = self.until(centre(RED))
+        self.check('first_load', elapsed is not None, "red frame shown" if elapsed else "red frame never shown", frame)
+
+        mc.load_file(self.media['blue'])
+        frame, elapsed = self.until(centre(BLUE))
+        cut_ms = elapsed * 1000.0 if elapsed is not None else None
+        self.check('cut_timing', cut_ms is not None and cut_ms <= max_cut_ms,
+                   f"first blue frame after {cut_ms:.0f} ms (limit {max_cut_ms:.0f} ms)" if cut_ms is not None
+                   else "blue frame never shown", frame)
+
+        mc.set_black(True)
+        frame, elapsed = self.until(lambda img: all(_close(c, BLACK, 8) for c in _grid(img)))
+        self.check('black_screen', elapsed is not None,
+                   f"black after {elapsed * 1000:.0f} ms" if elapsed is not None else "output not black", frame)
+        mc.set_black(False)
+        frame, elapsed = self.until(centre(BLUE))
+        self.check('black_release', elapsed is not None, "content back" if elapsed is not None else "still black", frame)
+
+        # A 16:9 image fills a 16:9 output edge to edge
+        ok = frame is not None and all(_close(_at(frame, fx, fy), BLUE) for fx, fy in ((0.01, 0.02), (0.99, 0.98)))
+        self.check('scale_16x9', ok, "fills the output" if ok else "unexpected borders", frame)
+
+        # A 4:3 image is pillarboxed: content 960 px wide, centred
+        mc.load_file(self.media['green_4x3'])
+        frame, elapsed = self.until(centre(GREEN))
+        bar = (OUTPUT_SIZE[0] - OUTPUT_SIZE[1] * 4 / 3) / 2 / OUTPUT_SIZE[0]
+        ok = elapsed is not None and _close(_at(frame, bar - 0.02, 0.5), BLACK, 8) and \
+            _close(_at(frame, bar + 0.02, 0.5), GREEN) and _close(_at(frame, 1 - bar + 0.02, 0.5), BLACK, 8)
+        self.check('scale_4x3', ok, "pillarboxed" if ok else "bars missing or misplaced", frame)
+        return self.results
+
+    def compare_golden(self, golden_dir, update, tolerance):
+        os.makedirs(golden_dir, exist_ok=True)
+        for name, frame in self.frames.items():
+            path = os.path.join(golden_dir, f"{name}.png")
+            if update or not os.path.exists(path):
+                frame.save(path)
+                continue
+            diff = _diff(frame, QImage(path))
+            self.check(f"golden_{name}", diff <= tolerance, f"mean difference {diff:.1f} (limit {tolerance})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', help="directory to write every captured frame to")
+    parser.add_argument('--golden', help="directory of reference frames")
+    parser.add_argument('--update', action='store_true', help="rewrite the reference frames")
+    parser.add_argument('--tolerance', type=float, default=6.0)
+    parser.add_argument('--max-cut-ms', type=float, default=1000.0)
+    parser.add_argument('--timeout', type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as media_dir:
+        try: run = GoldenRun(media_dir, args.timeout)
+        except Exception as e:
+            print(f"cannot run golden frames: {e}")
+            return 2
+        try:
+            run.run(args.max_cut_ms)
+            if args.golden: run.compare_golden(args.golden, args.update, args.tolerance)
+        finally:
+            run.close()
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for name, frame in run.frames.items(): frame.save(os.path.join(args.out, f"{name}.png"))
+    for name, ok, detail in run.results: print(f"{'PASS' if ok else 'FAIL'}  {name}: {detail}")
+    return 0 if all(ok for _, ok, _ in run.results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
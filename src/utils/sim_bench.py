@@ -0,0 +1,88 @@
+"""Drives the full control panel against the simulated player, faster than real time.
+
+    python -m src.utils.sim_bench --cuts 500 --open-latency 0.08 --drop-rate 0.01
+
+Cut latency is reported in virtual time (what the simulated player would cost); GUI cost is the
+wall-clock time the control panel spends handling each cut on the GUI thread.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import logging
+from PyQt6.QtWidgets import QApplication
+from src.core.media_controller import MediaController
+from src.core.playlist_manager import PlaylistManager
+from src.core.screen_manager import ScreenManager
+from src.core.sim_player import SimulatedMPV, SimFileProfile, VirtualClock
+from src.core.switch_metrics import LatencyHistogram
+from src.ui.main_window import MainWindow
+
+def run(cuts=100, files=10, interval=2.0, open_latency=0.05, seek_latency=0.02, drop_rate=0.0, seed=0):
+    app = QApplication.instance() or QApplication(sys.argv)
+    clock = VirtualClock()
+    profile = SimFileProfile(open_latency=open_latency, seek_latency=seek_latency, drop_rate=drop_rate)
+    players = []
+
+    def factory():
+        players.append(SimulatedMPV(clock=clock, default_profile=profile, seed=seed, realtime=False))
+        return players[-1]
+
+    media_controller = MediaController(player_factory=factory)
+    playlist_manager = PlaylistManager()
+    window = MainWindow(media_controller, playlist_manager, ScreenManager())
+
+    with tempfile.TemporaryDirectory() as media_dir:
+        paths = []
+        for i in range(files):
+            paths.append(os.path.join(media_dir, f"clip_{i:03d}.mp4"))
+            open(paths[-1], 'wb').close()
+        window._process_added_files(paths)
+
+        gui_cost = LatencyHistogram()
+        started = time.perf_counter()
+        for i in range(cuts):
+            t0 = time.perf_counter()
+            playlist_manager.set_current_index((i + 1) % files)
+            app.processEvents()
+            gui_cost.add((time.perf_counter() - t0) * 1000.0)
+            clock.advance(interval / 2)
+            media_controller.seek(interval)
+            clock.advance(interval / 2)
+            app.processEvents()
+        wall = time.perf_counter() - started
+
+    return {
+        'cuts': cuts, 'wall_seconds': wall, 'virtual_seconds': clock.now,
+        'speedup': clock.now / wall if wall else None,
+        'switch': media_controller.switch_metrics.summary(),
+        'gui_cost_ms': gui_cost.summary(),
+        'frame_drops': players[-1].frame_drop_count,
+    }
+
+def _fmt(summary):
+    return "  ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in summary.items())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cuts', type=int, default=100)
+    parser.add_argument('--files', type=int, default=10)
+    parser.add_argument('--interval', type=float, default=2.0, help="virtual seconds between cuts")
+    parser.add_argument('--open-latency', type=float, default=0.05)
+    parser.add_argument('--seek-latency', type=float, default=0.02)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    result = run(args.cuts, args.files, args.interval, args.open_latency, args.seek_latency, args.drop_rate, args.seed)
+    print(f"{result['cuts']} cuts, {result['virtual_seconds']:.0f}s virtual in {result['wall_seconds']:.2f}s wall "
+          f"({result['speedup']:.0f}x)")
+    for stage, summary in result['switch'].items(): print(f"  {stage} (virtual ms): {_fmt(summary)}")
+    print(f"  gui cost (wall ms): {_fmt(result['gui_cost_ms'])}")
+    print(f"  frame drops: {result['frame_drops']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,19 @@
 import os
-from PyQt6.QtGui import QPixmap, QImage, QPainter, QColor, QFont
-from PyQt6.QtCore import Qt, QRect
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtGui import QPixmap, QImage, QImageReader, QPainter, QColor, QFont
+from PyQt6.QtCore import Qt, QRect, QSize, QBuffer, QByteArray, QObject, pyqtSignal
 import logging
+from src.core.show_bundle import is_bundle_uri, parse_uri, read_uri
+from src.utils.tracer import tracer
 
 logger = logging.getLogger(__name__)
 
 class ThumbnailGenerator:
     @staticmethod
+    @tracer.traced('ThumbnailGenerator.generate', 'thumbnail')
     def generate(filepath, size=(160, 90)):
-        if not os.path.exists(filepath):
+        in_bundle = is_bundle_uri(filepath)
+        if not in_bundle and not os.path.exists(filepath):
             logger.error(f"Thumbnail generation failed: File not found {filepath}")
             return QPixmap()
 
@@ -18,7 +23,7 @@ class ThumbnailGenerator:
         # IMAGE HANDLER
         if ext in ['.jpg', '.jpeg', '.png', '.bmp', '.gif']:
             try:
-                pixmap = QPixmap(filepath)
+                pixmap = ThumbnailGenerator._load_from_bundle(filepath) if in_bundle else QPixmap(filepath)
                 if pixmap.isNull():
                     logger.warning(f"Failed to load image: {filepath}")
                     return ThumbnailGenerator._generate_placeholder(ext, size)
@@ -41,6 +46,42 @@ class ThumbnailGenerator:
             logger.warning(f"Unsupported format for thumbnail: {ext}")
             return ThumbnailGenerator._generate_placeholder("?", size)
 
+    @staticmethod
+    @tracer.traced('ThumbnailGenerator.load_image', 'thumbnail')
+    def load_image(filepath, size):
+        """Decodes an image straight to the requested size. Safe to call off the GUI thread."""
+        if os.path.splitext(filepath)[1].lower() not in ['.jpg', '.jpeg', '.png', '.bmp', '.gif']: return QImage()
+        buffer = None
+        if is_bundle_uri(filepath):
+            try:
+                with read_uri(filepath) as view:
+                    buffer = QBuffer()
+                    buffer.setData(QByteArray(view.tobytes()))
+            except (OSError, KeyError, ValueError) as e:
+                logger.error(f"Failed to read {filepath} from show bundle: {e}")
+                return QImage()
+            reader = QImageReader(buffer)
+        else:
+            reader = QImageReader(filepath)
+        reader.setAutoTransform(True)
+        source = reader.size()
+        if source.isValid():
+            # JPEG decoders can downscale while decoding, which is much cheaper than a full decode
+            reader.setScaledSize(source.scaled(QSize(*size), Qt.AspectRatioMode.KeepAspectRatioByExpanding))
+        image = reader.read()
+        if image.isNull(): logger.warning(f"Failed to load image: {filepath} ({reader.errorString()})")
+        return image
+
+    @staticmethod
+    def _load_from_bundle(uri):
+        pixmap = QPixmap()
+        try:
+            with read_uri(uri) as view:
+                pixmap.loadFromData(view.tobytes())
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"Failed to read {uri} from show bundle: {e}")
+        return pixmap
+
     @staticmethod
     def _generate_placeholder(text, size, filepath=None):
         pixmap = QPixmap(size[0], size[1])
@@ -59,7 +100,7 @@ class ThumbnailGenerator:
         
         display_text = text
         if filepath:
-            filename = os.path.basename(filepath)
+            filename = parse_uri(filepath)[1] if is_bundle_uri(filepath) else os.path.basename(filepath)
             display_text = f"VIDEO\n{filename[:10]}..."
             
         painter.drawText(QRect(0, 0, size[0], size[1]), 
@@ -68,3 +109,18 @@ class ThumbnailGenerator:
         
         painter.end()
         return pixmap
+
+class ThumbnailLoader(QObject):
+    """Runs ThumbnailGenerator.load_image on a worker thread and delivers results on the GUI thread."""
+    image_ready = pyqtSignal(str, QImage)
+
+    def __init__(self):
+        super().__init__()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ThumbnailLoader")
+
+    def request(self, filepath, size):
+        self._pool.submit(self._load, filepath, size)
+
+    def _load(self, filepath, size):
+        try: self.image_ready.emit(filepath, ThumbnailGenerator.load_image(filepath, size))
+        except Exception as e: logger.error(f"Background thumbnail failed for {filepath}: {e}")
@@ -0,0 +1,96 @@
+import os
+import json
+import time
+import logging
+import threading
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+class _NullSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('_recorder', '_name', '_cat', '_args', '_start')
+
+    def __init__(self, recorder, name, cat, args):
+        self._recorder, self._name, self._cat, self._args = recorder, name, cat, args
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type: self._args['error'] = exc_type.__name__
+        self._recorder._add('X', self._name, self._cat, self._start, self._args, dur=(end - self._start) / 1000.0)
+        return False
+
+class TraceRecorder:
+    """Collects spans and instants in memory and exports Chrome/Perfetto trace JSON.
+
+    While disabled, span() returns a shared no-op context and instant() returns immediately.
+    """
+    def __init__(self):
+        self.enabled = False
+        self._events = []
+        self._threads = {}
+        self._pid = os.getpid()
+
+    def start(self):
+        self.clear()
+        self.enabled = True
+        logger.info("Trace recording started")
+
+    def stop(self):
+        self.enabled = False
+        logger.info(f"Trace recording stopped ({len(self._events)} events)")
+
+    def clear(self):
+        self._events = []
+        self._threads = {}
+
+    def span(self, name, cat='app', **args):
+        if not self.enabled: return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def instant(self, name, cat='app', **args):
+        if self.enabled: self._add('i', name, cat, time.perf_counter_ns(), args, s='t')
+
+    def counter(self, name, cat='app', **values):
+        if self.enabled: self._add('C', name, cat, time.perf_counter_ns(), values)
+
+    def traced(self, name=None, cat='app'):
+        """Decorator form of span(); the disabled path is a single attribute check."""
+        def decorator(func):
+            label = name or func.__qualname__
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled: return func(*args, **kwargs)
+                with _Span(self, label, cat, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _add(self, ph, name, cat, ts_ns, args, **extra):
+        thread = threading.current_thread()
+        tid = thread.ident
+        if tid not in self._threads: self._threads[tid] = thread.name
+        event = {'ph': ph, 'name': name, 'cat': cat, 'ts': ts_ns / 1000.0, 'pid': self._pid, 'tid': tid, **extra}
+        if args: event['args'] = {k: v if isinstance(v, (int, float, bool, type(None))) else str(v) for k, v in args.items()}
+        # list.append is atomic, so mpv callback threads can record without a lock
+        self._events.append(event)
+
+    def export(self, path):
+        meta = [{'ph': 'M', 'name': 'thread_name', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+                for tid, name in list(self._threads.items())]
+        meta.append({'ph': 'M', 'name': 'process_name', 'pid': self._pid, 'args': {'name': 'ProVideoiPhoto'}})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': meta + list(self._events), 'displayTimeUnit': 'ms'}, f)
+        logger.info(f"Wrote trace with {len(self._events)} events to {path}")
+
+tracer = TraceRecorder()